@@ -1,74 +1,35 @@
-import requests
-import json
-import time
-import gzip
 import argparse
+import logging
 
+from lrseq.ena import fetch_long_read_records
+from lrseq.files import save_json_gz
+from lrseq.parse import add_parse_arguments, configure as configure_parsing
+from lrseq.profiling import add_profile_argument, profile_run, report_prefix, stage
+from lrseq.sampling import stratified_sample
 
-def fetch_ena(platform, tax_id):
-    print(f"🔍 Fetching {platform} samples from ENA for tax ID {tax_id}...")
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-    ena_url = "https://www.ebi.ac.uk/ena/portal/api/search"
-    query = f'instrument_platform="{platform}" AND tax_tree({tax_id})'
-    fields = "accession,sample_accession,scientific_name,instrument_platform,instrument_model,study_accession,read_count,base_count,library_strategy"
-
-    results = []
-
-    params = {
-        "result": "read_run",
-        "query": query,
-        "fields": fields,
-        "format": "json",
-        "limit": 0,
-    }
-
-    data = None
-    for attempt in range(3):
-        try:
-            response = requests.get(ena_url, params=params, timeout=60)
-            if not response.ok:
-                print(f"  ENA error body: {response.text[:500]}")
-            response.raise_for_status()
-            data = response.json()
-            break
-        except requests.exceptions.RequestException as err:
-            print(f"⚠️ Attempt {attempt+1} failed: {err}")
-            time.sleep(5)
-
-    if data is None:
-        print(f"❌ Failed to retrieve data for {platform}")
-        return []
-
-    for item in data:
-        results.append({
-            "sample_id": item.get("accession"),
-            "sample_accession": item.get("sample_accession", ""),
-            "scientific_name": item.get("scientific_name", "Unknown"),
-            "instrument_platform": item.get("instrument_platform", platform),
-            "instrument_model": item.get("instrument_model", ""),
-            "study_accession": item.get("study_accession", "NA"),
-            "read_count": int(item.get("read_count", 0) or 0),
-            "base_count": int(item.get("base_count", 0) or 0),
-            "library_strategy": item.get("library_strategy", "Unknown"),
-            "source": "ENA"
-        })
-
-    print(f"  Fetched {len(results)} records...")
-
-    return results
 
 def main():
     parser = argparse.ArgumentParser(description="Fetch genome data from ENA.")
     parser.add_argument("--tax-id", default="2", help="Taxonomy ID to fetch.")
     parser.add_argument("--output", default="genome-dashboard/data.json.gz", help="Output file path.")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Write a reproducible stratified subset of about this many records "
+                             "(whole biosamples, full schema) instead of the full dataset.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample-size. Default: 0.")
+    add_profile_argument(parser, "<output>")
+    add_parse_arguments(parser)
     args = parser.parse_args()
-
-    nanopore_data = fetch_ena("OXFORD_NANOPORE", args.tax_id)
-    pacbio_data = fetch_ena("PACBIO_SMRT", args.tax_id)
-
-    combined = nanopore_data + pacbio_data
-    with gzip.open(args.output, 'w') as fout:
-        fout.write(json.dumps(combined).encode('utf-8'))
+    configure_parsing(args.parse_workers, args.memory_budget_mb)
+
+    with profile_run(report_prefix(args.output), enabled=args.profile):
+        with stage("long_reads"):
+            combined = fetch_long_read_records(args.tax_id)
+        if args.sample_size is not None:
+            with stage("sample"):
+                combined = stratified_sample(combined, args.sample_size, args.seed)
+        save_json_gz(combined, args.output)
 
     print(f"✅ Saved {len(combined)} samples to {args.output}")
 
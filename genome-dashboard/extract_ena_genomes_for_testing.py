@@ -1,68 +1,35 @@
-import requests
-import json
-import random
-import time
-import gzip
+"""
+Write a small development dataset to genome-dashboard/test_data.json.gz.
 
-def fetch_ena(platform, size=500, tax_id="2"):
-    print(f"🔍 Fetching {platform} samples from ENA...")
+This is a thin wrapper around the stratified sampling mode of the production
+extractor, so the test data has the full schema (sample_accession,
+instrument_model, library_strategy, ...) and keeps whole biosamples, which is
+enough to exercise hybrid detection and the plots:
 
-    ena_url = "https://www.ebi.ac.uk/ena/portal/api/search"
-    query = f'instrument_platform="{platform}" AND tax_tree({tax_id})'
-    fields = "accession,scientific_name,instrument_platform,study_accession,read_count,base_count"
-    params = {
-        "result": "read_run",
-        "query": query,
-        "fields": fields,
-        "format": "json",
-        "limit": size
-    }
-    #url = "https://www.ebi.ac.uk/ena/portal/api/search"
-    #params = {
-    #    "result": "read_run",
-    #    "query": "tax_tree(2) AND (instrument_platform=\"ONT\" OR instrument_platform=\"PACBIO_SMRT\")",
-    #    "fields": "study_accession,sample_accession,run_accession,scientific_name,instrument_platform,read_count,base_count,first_public",
-    #    "format": "tsv",
-    #    "limit": 0  # Fetch all records
-    #}
+    python genome-dashboard/extract_ena_genomes.py --sample-size 20 --output genome-dashboard/test_data.json.gz
+"""
+import argparse
+import logging
 
-    for attempt in range(3):
-        try:
-            response = requests.get(ena_url, params=params, timeout=20)
-            response.raise_for_status()
-            data = response.json()
-            break
-        except requests.exceptions.RequestException as err:
-            print(f"⚠️ Attempt {attempt+1} failed: {err}")
-            time.sleep(5)
-    else:
-        print(f"❌ Failed to retrieve data for {platform}")
-        return []
+from lrseq.ena import fetch_long_read_records
+from lrseq.files import save_json_gz
+from lrseq.sampling import stratified_sample
+
+logging.basicConfig(level=logging.INFO, format='%(message)s')
 
-    results = []
-    for item in data:
-        results.append({
-            "sample_id": item.get("accession"),
-            "scientific_name": item.get("scientific_name", "Unknown"),
-            "instrument_platform": item.get("instrument_platform", platform),
-            "study_accession": item.get("study_accession", "NA"),
-            "read_count": int(item.get("read_count", 0)),
-            "base_count": int(item.get("base_count", 0)),
-            "source": "ENA"
-        })
-    return results
 
 def main():
-    nanopore_data = fetch_ena("OXFORD_NANOPORE", 10)
-    pacbio_data = fetch_ena("PACBIO_SMRT", 10)
+    parser = argparse.ArgumentParser(description="Fetch a small stratified test dataset from ENA.")
+    parser.add_argument("--tax-id", default="2", help="Taxonomy ID to fetch.")
+    parser.add_argument("--size", type=int, default=20, help="Approximate number of records. Default: 20.")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed. Default: 0.")
+    parser.add_argument("--output", default="genome-dashboard/test_data.json.gz", help="Output file path.")
+    args = parser.parse_args()
 
-    combined = nanopore_data + pacbio_data
-    #with open('genome-dashboard/test_data.json', 'w', encoding='utf-8') as f:
-    #    json.dump(combined, f, ensure_ascii=False, indent=4)
-    with gzip.open('genome-dashboard/test_data.json.gz', 'w') as fout:
-        fout.write(json.dumps(combined).encode('utf-8'))
+    combined = stratified_sample(fetch_long_read_records(args.tax_id), args.size, args.seed)
+    save_json_gz(combined, args.output)
 
-    print(f"✅ Saved {len(combined)} samples to genome-dashboard/test_data.json.gz")
+    print(f"✅ Saved {len(combined)} samples to {args.output}")
 
 if __name__ == "__main__":
     main()
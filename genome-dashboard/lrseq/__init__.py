@@ -0,0 +1,12 @@
+"""
+Importable pipeline stages behind the genome-dashboard scripts.
+
+* ``lrseq.ena``      — ENA Portal API queries and record conversion
+* ``lrseq.hybrid``   — long ∩ short-read biosample detection
+* ``lrseq.plots``    — sample-count history and organism plots
+* ``lrseq.files``    — gzip JSON load/save helpers
+* ``lrseq.pipeline`` — fetch → hybrid → plot in a single process
+
+Submodules are not imported here so that e.g. ``lrseq.hybrid`` can be used
+without pulling in matplotlib or requests.
+"""
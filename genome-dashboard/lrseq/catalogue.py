@@ -0,0 +1,197 @@
+"""
+Persistent catalogue of short-read runs keyed by biosample.
+
+Hybrid detection only needs to know which biosamples have short-read runs,
+but rebuilding that from ENA means downloading millions of runs per taxon
+every week.  The catalogue keeps them on disk as sorted fixed-width numpy
+arrays and is refreshed incrementally::
+
+    catalogue/
+        meta.json        watermarks per taxon, last full refresh
+        keys.npy         sorted unique biosample IDs            (S<n>)
+        offsets.npy      run row range per key, len(keys) + 1    (int64)
+        sample.npy run.npy platform.npy model.npy study.npy taxon.npy
+                         one row per run, sorted by biosample
+
+Readers open the arrays with ``mmap_mode='r'`` and binary-search the keys, so
+``--type wgs`` and ``--type mgx`` share one catalogue without loading it.
+Refreshes only fetch runs with ``last_updated`` on or after the taxon's
+watermark; a full refetch every ``full_refresh_days`` replaces all of the
+taxon's rows, dropping runs that ENA has since suppressed.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import date, timedelta
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .ena import SHORT_READ_PLATFORMS, fetch_ena_batches
+from .hybrid import is_valid_sample
+
+logger = logging.getLogger(__name__)
+
+CATALOGUE_FIELDS = "accession,sample_accession,instrument_platform,instrument_model,study_accession"
+
+# Catalogue column → ENA field
+COLUMNS = {
+    "sample": "sample_accession",
+    "run": "accession",
+    "platform": "instrument_platform",
+    "model": "instrument_model",
+    "study": "study_accession",
+}
+
+# All stored columns; ``taxon`` records which tax_tree() query fetched the run
+STORED_COLUMNS = list(COLUMNS) + ["taxon"]
+
+
+def _encode(values: Iterable[str]) -> np.ndarray:
+    arr = np.array([v.encode("utf-8") for v in values], dtype=bytes)
+    return arr if arr.size else np.array([], dtype="S1")
+
+
+class ShortReadCatalogue:
+    """Read side of the catalogue: memory-mapped sorted arrays."""
+
+    def __init__(self, path: str):
+        self.path = path
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                self.meta = json.load(f)
+            load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")  # noqa: E731
+            self.keys = load("keys")
+            self.offsets = load("offsets")
+            self.columns = {name: load(name) for name in STORED_COLUMNS}
+        else:
+            self.meta = {"version": 1, "watermarks": {}, "full_refresh": {}}
+            self.keys = np.array([], dtype="S1")
+            self.offsets = np.zeros(1, dtype=np.int64)
+            self.columns = {name: np.array([], dtype="S1") for name in STORED_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.columns["run"])
+
+    def covers(self, tax_id: str) -> bool:
+        """True once a refresh of ``tax_id`` has succeeded; until then lookups would miss every biosample."""
+        return tax_id in self.meta["watermarks"]
+
+    def lookup(self, biosamples: Iterable[str]) -> dict:
+        """Return {biosample: [run_dict, ...]} for the biosamples that have short reads."""
+        width = self.keys.dtype.itemsize
+        wanted = sorted({b for b in biosamples if len(b.encode("utf-8")) <= width})
+        if not wanted or not len(self.keys):
+            return {}
+        query = np.array([b.encode("utf-8") for b in wanted], dtype=self.keys.dtype)
+        idx = np.searchsorted(self.keys, query)
+        found = idx < len(self.keys)
+        found[found] = self.keys[idx[found]] == query[found]
+
+        result = {}
+        for sample, i in zip(np.asarray(wanted, dtype=object)[found], idx[found]):
+            start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+            result[sample] = [
+                {field: self.columns[col][row].decode("utf-8") for col, field in COLUMNS.items()}
+                for row in range(start, end)
+            ]
+        return result
+
+
+def _fetch_columns(tax_id: str, since: Optional[str]) -> dict:
+    """Fetch short-read runs for a taxon (optionally only those updated since ``since``) as columns."""
+    columns = {name: [] for name in COLUMNS}
+    for platform in SHORT_READ_PLATFORMS:
+        query = f'instrument_platform="{platform}" AND tax_tree({tax_id})'
+        if since:
+            query += f" AND last_updated>={since}"
+        for batch in fetch_ena_batches(query, CATALOGUE_FIELDS, platform, strict=True):
+            for name, field in COLUMNS.items():
+                columns[name].extend(batch.columns.get(field, [""] * batch.n_rows))
+    keep = [i for i, s in enumerate(columns["sample"]) if is_valid_sample(s)]
+    fresh = {name: _encode(col[i].strip() if name == "sample" else col[i] for i in keep)
+             for name, col in columns.items()}
+    fresh["taxon"] = np.full(len(keep), tax_id.encode("utf-8"))
+    return fresh
+
+
+def _write(path: str, columns: dict, meta: dict) -> None:
+    """Sort by biosample, build keys/offsets and atomically replace the catalogue at ``path``."""
+    order = np.lexsort((columns["run"], columns["sample"]))
+    columns = {name: col[order] for name, col in columns.items()}
+    keys, first = np.unique(columns["sample"], return_index=True)
+    offsets = np.append(first, len(columns["sample"])).astype(np.int64)
+
+    tmp = f"{path}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    np.save(os.path.join(tmp, "keys.npy"), keys)
+    np.save(os.path.join(tmp, "offsets.npy"), offsets)
+    for name, col in columns.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), col)
+    meta = dict(meta, n_samples=int(len(keys)), n_runs=int(len(columns["run"])))
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=1)
+
+    old = f"{path}.old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def refresh_catalogue(path: str, tax_ids: Iterable[str], full_refresh_days: int = 28,
+                      today: Optional[date] = None) -> ShortReadCatalogue:
+    """
+    Bring the catalogue at ``path`` up to date for ``tax_ids`` and return it.
+
+    Taxa without a watermark, or whose last full refresh is older than
+    ``full_refresh_days``, are refetched in full; others only fetch runs
+    updated since their watermark.  A failed refresh keeps the previous rows,
+    so check ``covers(tax_id)`` before trusting lookups for a taxon.
+    """
+    today = today or date.today()
+    current = ShortReadCatalogue(path)
+    meta = {
+        "version": 1,
+        "watermarks": dict(current.meta["watermarks"]),
+        "full_refresh": dict(current.meta["full_refresh"]),
+    }
+    columns = {name: np.asarray(col) for name, col in current.columns.items()}
+
+    for tax_id in tax_ids:
+        watermark = meta["watermarks"].get(tax_id)
+        last_full = meta["full_refresh"].get(tax_id)
+        full = (watermark is None or last_full is None
+                or date.fromisoformat(last_full) <= today - timedelta(days=full_refresh_days))
+        # ``>=`` re-reads the watermark day itself, in case runs landed after the last refresh
+        since = None if full else watermark
+        logger.info(f"Short-read catalogue: {'full' if full else f'delta since {since}'} refresh for tax_id={tax_id}")
+        try:
+            fresh = _fetch_columns(tax_id, since)
+        except RuntimeError as exc:
+            # Keep the previous rows and watermark so the next run retries this window
+            logger.error(f"  Catalogue refresh for tax_id={tax_id} failed: {exc}")
+            continue
+
+        if full:
+            stale = columns["taxon"] == tax_id.encode("utf-8")
+        else:
+            stale = np.zeros(len(columns["run"]), dtype=bool)
+        if len(fresh["run"]):
+            stale |= np.isin(columns["run"], fresh["run"])
+        columns = {name: np.concatenate([columns[name][~stale], fresh[name]]) for name in STORED_COLUMNS}
+        logger.info(f"  {len(fresh['run']):,} runs fetched, {int(stale.sum()):,} replaced")
+
+        meta["watermarks"][tax_id] = today.isoformat()
+        if full:
+            meta["full_refresh"][tax_id] = today.isoformat()
+
+    _write(path, columns, meta)
+    catalogue = ShortReadCatalogue(path)
+    logger.info(f"Short-read catalogue: {len(catalogue.keys):,} biosamples, {len(catalogue):,} runs")
+    return catalogue
@@ -0,0 +1,187 @@
+"""ENA Portal API queries for long- and short-read runs."""
+
+import logging
+import time
+from collections import defaultdict
+from itertools import repeat
+from typing import Container, Iterable, Iterator, Optional
+
+import requests
+
+from .hybrid import index_batches
+from .parse import ColumnBatch, parse_spool, spool_response
+from .profiling import stage
+
+logger = logging.getLogger(__name__)
+
+ENA_API_URL = "https://www.ebi.ac.uk/ena/portal/api/search"
+
+LONG_READ_PLATFORMS = ["OXFORD_NANOPORE", "PACBIO_SMRT"]
+
+# All ENA short-read platform codes
+SHORT_READ_PLATFORMS = ["ILLUMINA", "ION_TORRENT", "BGISEQ", "LS454", "COMPLETE_GENOMICS"]
+
+# Dataset type → ENA taxonomy ID ('wgs' → bacteria, 'mgx' → metagenomes)
+TAX_IDS = {"wgs": "2", "mgx": "408169"}
+
+# Fields for the dashboard long-read datasets (data_*.json.gz)
+GENOME_FIELDS = "accession,sample_accession,scientific_name,instrument_platform,instrument_model,study_accession,read_count,base_count,library_strategy,first_public"
+
+# Fields needed for hybrid detection
+RUN_FIELDS = "accession,sample_accession,scientific_name,instrument_platform,instrument_model,study_accession,library_strategy"
+
+
+def _download(params: dict, label: str, retries: int, timeout: int, post: bool, strict: bool):
+    """Spool one ENA response (see ``lrseq.parse``), retrying failed requests; None if all fail."""
+    for attempt in range(retries):
+        spool = None
+        try:
+            if post:
+                resp = requests.post(ENA_API_URL, data=params, timeout=timeout, stream=True)
+            else:
+                resp = requests.get(ENA_API_URL, params=params, timeout=timeout, stream=True)
+            if not resp.ok:
+                logger.warning(f"  ENA error body: {resp.text[:500]}")
+            resp.raise_for_status()
+            spool = spool_response(resp)
+            return spool
+        except Exception as exc:
+            if spool is not None:
+                spool.close()
+            wait = 5 * (attempt + 1)
+            logger.warning(f"  {label} attempt {attempt + 1} failed: {exc}. Retrying in {wait}s...")
+            time.sleep(wait)
+    if strict:
+        raise RuntimeError(f"{label}: all {retries} attempts failed")
+    logger.error(f"  {label}: all {retries} attempts failed — skipping.")
+    return None
+
+
+def fetch_ena_batches(query: str, fields: str = RUN_FIELDS, label: str = "",
+                      retries: int = 3, timeout: int = 120, post: bool = False,
+                      strict: bool = False) -> Iterator[ColumnBatch]:
+    """
+    Run one ENA read_run search and yield the rows as ColumnBatches
+    (see ``lrseq.parse``); numeric fields come back as int64 columns.
+    The response is downloaded (with retries) before the first batch, then
+    decoded as the batches are consumed, so only the chunks in flight are
+    held in memory.  ``post`` sends the query as a form body, for queries
+    too long for a URL.  With ``strict`` a request that fails every retry
+    raises RuntimeError instead of yielding no rows.
+    """
+    label = label or query
+    params = {
+        "result": "read_run",
+        "query": query,
+        "fields": fields,
+        "format": "tsv",
+        "limit": 0,
+    }
+    with stage("ena.download"):
+        spool = _download(params, label, retries, timeout, post, strict)
+    if spool is None:
+        return
+    n_rows = 0
+    try:
+        # ENA returns an empty body rather than a header when nothing matches
+        for batch in parse_spool(spool):
+            n_rows += batch.n_rows
+            yield batch
+    finally:
+        spool.close()
+    logger.info(f"  {label}: {n_rows:,} runs fetched")
+
+
+def fetch_ena_platform(platform: str, tax_id: str, fields: str = RUN_FIELDS,
+                       retries: int = 3, timeout: int = 120, strict: bool = False) -> Iterator[ColumnBatch]:
+    """Yield all runs for a single ENA instrument_platform + taxonomy (one request) as ColumnBatches."""
+    query = f'instrument_platform="{platform}" AND tax_tree({tax_id})'
+    return fetch_ena_batches(query, fields, platform, retries, timeout, strict=strict)
+
+
+def fetch_run_index(platforms: list, tax_id: str, fields: str = RUN_FIELDS,
+                    samples: Optional[Container] = None, strict: bool = False) -> dict:
+    """
+    Fetch runs for several platforms into {sample_accession: [run_dict, ...]}
+    (see ``lrseq.hybrid.index_batches``).  With ``samples`` only runs of those
+    biosamples become dicts, e.g. short reads of the long-read biosamples.
+    With ``strict`` a platform that cannot be fetched raises RuntimeError
+    rather than silently missing from the index.
+    """
+    by_sample = defaultdict(list)
+    for platform in platforms:
+        index_batches(fetch_ena_platform(platform, tax_id, fields, strict=strict), samples, by_sample)
+    return by_sample
+
+
+def genome_records(batch: ColumnBatch, platform: str = "") -> list:
+    """Convert a ColumnBatch of GENOME_FIELDS rows into the dashboard data schema."""
+    columns = batch.unpack().columns
+    n = batch.n_rows
+
+    def column(name, default):
+        return columns[name] if name in columns else repeat(default, n)
+
+    return [
+        {
+            "sample_id": accession,
+            "sample_accession": sample,
+            "scientific_name": name,
+            "instrument_platform": inst_platform,
+            "instrument_model": model,
+            "study_accession": study,
+            "read_count": read_count,
+            "base_count": base_count,
+            "library_strategy": strategy,
+            "first_public": first_public,
+            "source": "ENA"
+        }
+        for accession, sample, name, inst_platform, model, study, read_count, base_count, strategy, first_public
+        in zip(column("accession", None), column("sample_accession", ""), column("scientific_name", "Unknown"),
+               column("instrument_platform", platform), column("instrument_model", ""),
+               column("study_accession", "NA"), column("read_count", 0), column("base_count", 0),
+               column("library_strategy", "Unknown"), column("first_public", ""))
+    ]
+
+
+def fetch_ena(platform: str, tax_id: str, strict: bool = False) -> list:
+    """Fetch one long-read platform for a taxon as dashboard records."""
+    logger.info(f"🔍 Fetching {platform} samples from ENA for tax ID {tax_id}...")
+    records = []
+    for batch in fetch_ena_platform(platform, tax_id, GENOME_FIELDS, timeout=60, strict=strict):
+        with stage("ena.records"):
+            records.extend(genome_records(batch, platform))
+    return records
+
+
+def fetch_long_read_records(tax_id: str, strict: bool = False) -> list:
+    """
+    Fetch dashboard records for all long-read platforms of a taxon.  With
+    ``strict`` a platform that cannot be fetched raises RuntimeError instead
+    of leaving a partial dataset.
+    """
+    records = []
+    for platform in LONG_READ_PLATFORMS:
+        records.extend(fetch_ena(platform, tax_id, strict))
+    return records
+
+
+def fetch_run_index_for_samples(platforms: list, sample_accessions: Iterable[str], fields: str = RUN_FIELDS,
+                                batch_size: int = 200) -> dict:
+    """
+    Fetch runs on ``platforms`` for the given biosamples only, indexed like
+    fetch_run_index().
+
+    Much cheaper than fetch_run_index() when the biosample set is small (e.g.
+    a sampled development dataset), since only matching runs are downloaded.
+    """
+    platform_clause = " OR ".join(f'instrument_platform="{p}"' for p in platforms)
+    samples = sorted(set(sample_accessions))
+    by_sample = defaultdict(list)
+    for i in range(0, len(samples), batch_size):
+        batch = samples[i:i + batch_size]
+        sample_clause = " OR ".join(f'sample_accession="{s}"' for s in batch)
+        label = f"biosamples {i + 1}-{i + len(batch)} of {len(samples)}"
+        query = f"({sample_clause}) AND ({platform_clause})"
+        index_batches(fetch_ena_batches(query, fields, label, post=True), by_sample=by_sample)
+    return by_sample
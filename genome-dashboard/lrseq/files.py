@@ -0,0 +1,29 @@
+"""gzip JSON helpers shared by the pipeline stages."""
+
+import gzip
+import json
+import logging
+import os
+
+from .profiling import stage
+
+logger = logging.getLogger(__name__)
+
+
+def load_json_gz(path: str) -> list:
+    """Load and return data from a gzipped JSON file ([] if missing or unreadable)."""
+    if not os.path.exists(path):
+        logger.warning(f"{path} not found.")
+        return []
+    try:
+        with stage("json.load"), gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as exc:
+        logger.error(f"Error reading {path}: {exc}")
+        return []
+
+
+def save_json_gz(records: list, path: str) -> None:
+    """Write ``records`` to ``path`` as gzipped JSON."""
+    with stage("json.save"), gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(records, f)
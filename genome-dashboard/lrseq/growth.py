@@ -0,0 +1,76 @@
+"""
+Cumulative sample growth backfilled from ENA ``first_public`` dates.
+
+Instead of relying on one ``sample_counts.csv`` point per workflow run, the
+growth curve is rebuilt from a single snapshot: every run's first_public day
+is binned per platform with one ``np.bincount`` and cumulatively summed.  The
+daily table can then be resampled to any resolution for plotting.
+"""
+
+import logging
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATE_FIELD = "first_public"
+GROUP_FIELD = "instrument_platform"
+
+
+def cumulative_counts(records: Iterable[dict], date_field: str = DATE_FIELD,
+                      group_field: str = GROUP_FIELD) -> pd.DataFrame:
+    """
+    Return a daily DataFrame (DatetimeIndex) of cumulative record counts, one
+    column per ``group_field`` value.  Records without a parseable date are
+    ignored.
+    """
+    dates = []
+    groups = []
+    for r in records:
+        dates.append(r.get(date_field) or "")
+        groups.append(r.get(group_field) or "Unknown")
+
+    days = pd.to_datetime(pd.Series(dates, dtype="object"), errors="coerce", format="%Y-%m-%d").to_numpy("datetime64[D]")
+    valid = ~np.isnat(days)
+    if not valid.any():
+        return pd.DataFrame()
+    days = days[valid]
+    names, codes = np.unique(np.asarray(groups, dtype=object)[valid].astype(str), return_inverse=True)
+
+    start = days.min()
+    offsets = (days - start).astype(np.int64)
+    n_days = int(offsets.max()) + 1
+    hist = np.bincount(codes * n_days + offsets, minlength=len(names) * n_days).reshape(len(names), n_days)
+
+    index = pd.date_range(pd.Timestamp(start), periods=n_days, freq="D")
+    return pd.DataFrame(np.cumsum(hist, axis=1).T, index=index, columns=list(names))
+
+
+def build_growth_table(datasets: dict) -> pd.DataFrame:
+    """
+    Combine {label: records} into one daily table with ``<label>_<platform>``
+    and ``<label>_total`` columns, forward-filled over the union of dates.
+    """
+    frames = []
+    for label, records in datasets.items():
+        df = cumulative_counts(records)
+        if df.empty:
+            logger.warning(f"No {DATE_FIELD} dates in {label} records — skipping.")
+            continue
+        df["total"] = df.sum(axis=1)
+        frames.append(df.add_prefix(f"{label}_"))
+    if not frames:
+        return pd.DataFrame()
+    table = pd.concat(frames, axis=1).sort_index()
+    table = table.asfreq("D").ffill().fillna(0).astype(np.int64)
+    table.index.name = "date"
+    return table
+
+
+def resample_growth(table: pd.DataFrame, freq: str = "W") -> pd.DataFrame:
+    """Downsample a daily cumulative table to ``freq`` (pandas offset alias), keeping period-end values."""
+    if table.empty or freq == "D":
+        return table
+    return table.resample(freq).last().ffill()
@@ -0,0 +1,125 @@
+"""
+Find BioSamples with both long-read and short-read runs.
+
+Runs are intersected in memory by ``sample_accession``; the inputs are raw ENA
+run dicts indexed straight from the parsed columns (``index_batches``, see
+``lrseq.ena.fetch_run_index``) or dashboard records converted with
+``runs_from_records``.
+"""
+
+import logging
+from collections import defaultdict
+from typing import Container, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def is_valid_sample(sample_accession) -> bool:
+    """True for non-empty biosample IDs that are not placeholders."""
+    sa = (sample_accession or "").strip()
+    return bool(sa) and sa.upper() not in ("N/A", "NONE")
+
+
+def index_by_sample(runs: Iterable[dict]) -> dict:
+    """Return {sample_accession: [run_dict, ...]} for non-empty sample accessions."""
+    by_sample = defaultdict(list)
+    for run in runs:
+        sa = (run.get("sample_accession") or "").strip()
+        if is_valid_sample(sa):
+            by_sample[sa].append(run)
+    return by_sample
+
+
+def index_batches(batches: Iterable, samples: Optional[Container] = None,
+                  by_sample: Optional[dict] = None) -> dict:
+    """
+    index_by_sample() for ENA ColumnBatches (see ``lrseq.parse``), adding to
+    ``by_sample`` if given.  Run dicts are only built for rows that are kept:
+    with ``samples``, those whose biosample is in it.
+    """
+    by_sample = defaultdict(list) if by_sample is None else by_sample
+    for batch in batches:
+        columns = batch.unpack().columns
+        names = list(columns)
+        for i, sa in enumerate(columns.get("sample_accession", ())):
+            sa = sa.strip()
+            if (samples is None or sa in samples) and is_valid_sample(sa):
+                by_sample[sa].append({name: columns[name][i] for name in names})
+    return by_sample
+
+
+def build_run_info(run: dict) -> dict:
+    return {
+        "run_accession": run.get("accession", ""),
+        "instrument_model": run.get("instrument_model", ""),
+        "instrument_platform": run.get("instrument_platform", ""),
+        "study_accession": run.get("study_accession", ""),
+    }
+
+
+def _run_order(info: dict) -> tuple:
+    return info["run_accession"], info["instrument_model"], info["study_accession"]
+
+
+def collect_pubmed_ids(runs: list) -> list:
+    """Return a sorted list of unique non-empty PubMed IDs from a list of run dicts."""
+    ids = set()
+    for r in runs:
+        raw = (r.get("pubmed_id") or "").strip()
+        for pid in raw.replace(",", " ").split():
+            if pid:
+                ids.add(pid)
+    return sorted(ids)
+
+
+def runs_from_records(records: Iterable[dict]) -> list:
+    """
+    Convert dashboard records (as produced by ``lrseq.ena.fetch_long_read_records``)
+    into run dicts compatible with index_by_sample().  Records without a
+    biosample ID are dropped.
+    """
+    runs = []
+    skipped = 0
+    for r in records:
+        sa = (r.get("sample_accession") or "").strip()
+        if not is_valid_sample(sa):
+            skipped += 1
+            continue
+        runs.append({
+            "accession": r.get("sample_id", ""),
+            "sample_accession": sa,
+            "scientific_name": r.get("scientific_name", ""),
+            "instrument_platform": r.get("instrument_platform", ""),
+            "instrument_model": r.get("instrument_model", ""),
+            "study_accession": r.get("study_accession", ""),
+            "pubmed_id": r.get("pubmed_id", ""),
+        })
+    logger.info(f"  Loaded {len(runs):,} long-read runs ({skipped:,} skipped — no biosample ID)")
+    return runs
+
+
+def find_hybrid_samples(long_by_sample: dict, short_by_sample: dict) -> list:
+    """
+    Intersect long- and short-read runs indexed with index_by_sample() and
+    return one hybrid record per shared biosample, sorted by biosample ID.
+    Runs and study accessions within a record are sorted too, so an unchanged
+    biosample produces an identical record every week (see lrseq.snapshots).
+    """
+    hybrid_samples = sorted(set(long_by_sample) & set(short_by_sample))
+    logger.info(f"Hybrid biosamples (long ∩ short): {len(hybrid_samples):,}")
+
+    results = []
+    for sample in hybrid_samples:
+        lr = long_by_sample[sample]
+        sr = short_by_sample[sample]
+        study_accs = sorted({r.get("study_accession", "") for r in lr + sr} - {""})
+        scientific_name = next((r.get("scientific_name", "") for r in lr if r.get("scientific_name")), "")
+        results.append({
+            "biosample": sample,
+            "scientific_name": scientific_name,
+            "pubmed_ids": collect_pubmed_ids(lr + sr),
+            "long_reads": sorted((build_run_info(r) for r in lr), key=_run_order),
+            "short_reads": sorted((build_run_info(r) for r in sr), key=_run_order),
+            "study_accession": study_accs,
+        })
+    return results
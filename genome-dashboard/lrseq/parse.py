@@ -0,0 +1,248 @@
+"""
+Memory-budgeted, multi-core parsing of ENA Portal API responses.
+
+Responses are requested as TSV so they can be split on line boundaries.  The
+body is streamed into a spool — kept in memory while it fits the budget,
+otherwise written to a temporary file — then cut into line-aligned byte
+ranges that worker processes decode independently into ``ColumnBatch``es
+with typed numeric columns (chunks of an in-memory spool are sent as bytes).
+The pool is used whenever a response spans several chunks; at most
+``workers`` chunks are in flight and the chunk size is derived from the
+budget, so peak decode memory stays bounded however large the response is.
+Batches are yielded in order for callers to consume as they arrive.
+
+Defaults come from ``LRSEQ_PARSE_WORKERS`` / ``LRSEQ_MEMORY_BUDGET_MB`` (empty
+or invalid values are ignored) and can be changed with configure(); scripts
+expose them with add_parse_arguments().
+"""
+
+import logging
+import os
+import tempfile
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Iterator, Optional
+
+from .profiling import stage, worker_initializer
+
+logger = logging.getLogger(__name__)
+
+# ENA fields decoded into int64 columns (empty → 0)
+NUMERIC_FIELDS = {"read_count", "base_count"}
+
+# TSV column names that differ from the JSON keys callers expect
+HEADER_ALIASES = {"run_accession": "accession"}
+
+MIN_CHUNK_BYTES = 1 << 20
+
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+
+def _env_int(name: str) -> Optional[int]:
+    """A positive integer from the environment; None if unset, empty or invalid."""
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        logger.warning(f"Ignoring {name}={value!r}: not a positive integer")
+        return None
+    return number
+
+
+_settings = {
+    "workers": _env_int("LRSEQ_PARSE_WORKERS") or os.cpu_count() or 1,
+    "memory_budget": (_env_int("LRSEQ_MEMORY_BUDGET_MB") or DEFAULT_MEMORY_BUDGET_MB) << 20,
+}
+
+
+def configure(workers: Optional[int] = None, memory_budget_mb: Optional[int] = None) -> None:
+    """Override the number of parse processes and the memory budget (MiB)."""
+    if workers:
+        _settings["workers"] = workers
+    if memory_budget_mb:
+        _settings["memory_budget"] = memory_budget_mb << 20
+
+
+def add_parse_arguments(parser) -> None:
+    """Add ``--parse-workers``/``--memory-budget-mb`` to a script's argparse parser (see configure())."""
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Processes used to decode ENA responses. Default: $LRSEQ_PARSE_WORKERS or CPU count.")
+    parser.add_argument("--memory-budget-mb", type=int, default=None,
+                        help="Memory budget for spooling/decoding ENA responses. "
+                             f"Default: $LRSEQ_MEMORY_BUDGET_MB or {DEFAULT_MEMORY_BUDGET_MB}.")
+
+
+# Joins string columns into one str for the trip back from a worker process;
+# pickling one large str is far cheaper than pickling a list of small ones
+_PACK_SEP = "\x1f"
+
+
+@dataclass
+class ColumnBatch:
+    """A block of ENA rows stored column-wise; numeric fields are ``array('q')``."""
+    columns: dict = field(default_factory=dict)
+    n_rows: int = 0
+    packed: bool = False
+
+    def pack(self) -> "ColumnBatch":
+        columns = {name: col if isinstance(col, array) else _PACK_SEP.join(col)
+                   for name, col in self.columns.items()}
+        return ColumnBatch(columns, self.n_rows, packed=True)
+
+    def unpack(self) -> "ColumnBatch":
+        if not self.packed:
+            return self
+        columns = {name: col if isinstance(col, array) else (col.split(_PACK_SEP) if self.n_rows else [])
+                   for name, col in self.columns.items()}
+        return ColumnBatch(columns, self.n_rows)
+
+    def records(self) -> list:
+        """Return the rows as dicts keyed by field name."""
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*self.unpack().columns.values())]
+
+
+def parse_lines(data: bytes, header: list) -> ColumnBatch:
+    """Decode a block of TSV rows (bytes, no header) into a ColumnBatch."""
+    width = len(header)
+    text = data.decode("utf-8").replace("\r\n", "\n").rstrip("\n")
+    lines = text.split("\n") if text else []
+    n_rows = len(lines)
+
+    # Fast path: every row has exactly ``width`` fields, so the flattened cell
+    # list can be sliced into columns without a per-row split.  The count has
+    # to hold per row: rows ragged in opposite directions balance out overall
+    tabs = width - 1
+    if all(line.count("\t") == tabs for line in lines):
+        flat = text.replace("\n", "\t").split("\t") if text else []
+        columns = {name: flat[i::width] for i, name in enumerate(header)}
+    else:
+        columns = {name: [] for name in header}
+        cols = list(columns.values())
+        n_rows = 0
+        for line in lines:
+            if not line:
+                continue
+            values = line.split("\t")
+            values += [""] * (width - len(values))
+            for col, value in zip(cols, values):
+                col.append(value)
+            n_rows += 1
+
+    for name in header:
+        if name in NUMERIC_FIELDS:
+            columns[name] = array("q", [int(v) if v else 0 for v in columns[name]])
+    return ColumnBatch(columns, n_rows)
+
+
+def _parse_range(source, start: int, end: int, header: list) -> ColumnBatch:
+    """Worker entry point: decode bytes [start, end) of the spooled file, or a chunk passed as bytes."""
+    if isinstance(source, bytes):
+        return parse_lines(source, header).pack()
+    with open(source, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_lines(data, header).pack()
+
+
+def chunk_ranges(f, start: int, size: int, chunk_bytes: int) -> list:
+    """Split [start, size) of a seekable file into ranges that end on newlines."""
+    ranges = []
+    pos = start
+    while pos < size:
+        end = min(pos + chunk_bytes, size)
+        if end < size:
+            f.seek(end)
+            end += len(f.readline())
+        ranges.append((pos, end))
+        pos = end
+    return ranges
+
+
+class _Spool:
+    """Write-once buffer that moves from memory to a named temp file past ``limit`` bytes."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.file = BytesIO()
+        self.path = None
+        self.size = 0
+
+    def write(self, data: bytes) -> None:
+        if self.path is None and self.size + len(data) > self.limit:
+            tmp = tempfile.NamedTemporaryFile(prefix="ena-", suffix=".tsv", delete=False)
+            tmp.write(self.file.getvalue())
+            self.file, self.path = tmp, tmp.name
+        self.file.write(data)
+        self.size += len(data)
+
+    def close(self) -> None:
+        self.file.close()
+        if self.path:
+            os.unlink(self.path)
+
+
+def spool_response(resp, memory_budget: Optional[int] = None) -> _Spool:
+    """Stream a ``requests`` response body into a spool bounded by half the budget."""
+    spool = _Spool((memory_budget or _settings["memory_budget"]) // 2)
+    for block in resp.iter_content(chunk_size=MIN_CHUNK_BYTES):
+        spool.write(block)
+    spool.file.flush()
+    return spool
+
+
+def parse_spool(spool: _Spool, workers: Optional[int] = None,
+                memory_budget: Optional[int] = None) -> Iterator[ColumnBatch]:
+    """Yield ColumnBatches from a spooled TSV body, in file order."""
+    workers = workers or _settings["workers"]
+    memory_budget = memory_budget or _settings["memory_budget"]
+    f = spool.file
+    f.seek(0)
+    header_line = f.readline()
+    if not header_line.strip():
+        return
+    header = header_line.rstrip(b"\r\n").decode("utf-8").split("\t")
+    header = [HEADER_ALIASES[h] if h in HEADER_ALIASES and HEADER_ALIASES[h] not in header else h
+              for h in header]
+
+    # Decoded rows take several times their TSV size, and each in-flight
+    # chunk is held by a worker and again while being returned
+    chunk_bytes = max(MIN_CHUNK_BYTES, memory_budget // (workers * 8))
+    ranges = chunk_ranges(f, len(header_line), spool.size, chunk_bytes)
+
+    if workers == 1 or len(ranges) == 1:
+        for start, end in ranges:
+            f.seek(start)
+            with stage("ena.parse"):
+                batch = parse_lines(f.read(end - start), header)
+            yield batch
+        return
+
+    def submit(start: int, end: int):
+        if spool.path is not None:
+            return pool.submit(_parse_range, spool.path, start, end, header)
+        f.seek(start)
+        return pool.submit(_parse_range, f.read(end - start), start, end, header)
+
+    logger.debug(f"Parsing {spool.size:,} bytes in {len(ranges)} chunks with {workers} workers")
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges)), initializer=worker_initializer) as pool:
+        pending = deque()
+        remaining = iter(ranges)
+        for start, end in remaining:
+            pending.append(submit(start, end))
+            if len(pending) >= workers:
+                break
+        while pending:
+            with stage("ena.parse"):
+                batch = pending.popleft().result().unpack()
+            nxt = next(remaining, None)
+            if nxt is not None:
+                pending.append(submit(*nxt))
+            yield batch
@@ -0,0 +1,174 @@
+"""
+Run fetch → hybrid → plot in one process.
+
+Each stage hands its records to the next in memory; the gzip JSON files the
+dashboard serves are still written, but nothing is parsed back from disk.
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from .ena import SHORT_READ_PLATFORMS, TAX_IDS, fetch_long_read_records, fetch_run_index, fetch_run_index_for_samples
+from .files import load_json_gz, save_json_gz
+from .hybrid import find_hybrid_samples, index_by_sample, runs_from_records
+from .profiling import stage
+from .sampling import stratified_sample
+from .snapshots import open_store
+
+logger = logging.getLogger(__name__)
+
+# The served dashboard directory (genome-dashboard/); its plots are tracked in git
+DASHBOARD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dataset type → long-read output file name
+DATA_FILES = {"wgs": "data_bacteria.json.gz", "mgx": "data_metagenome.json.gz"}
+
+
+@dataclass
+class DatasetResult:
+    """In-memory output of the fetch and hybrid stages for one dataset type.
+
+    ``records`` is None when the long reads could not be fetched, ``hybrids``
+    when hybrid detection was skipped; the previous files are kept for either.
+    """
+    records: Optional[list] = None
+    hybrids: Optional[list] = None
+
+
+def build_dataset(data_type: str, sample_size: Optional[int] = None, seed: int = 0,
+                  catalogue=None) -> DatasetResult:
+    """
+    Fetch long-read records for ``data_type`` and find its hybrid biosamples.
+    Both stages are skipped if the long reads cannot all be fetched, and
+    hybrid detection if the short reads cannot, so an ENA outage never
+    replaces the data with an empty or partial list.
+
+    With ``sample_size`` the long-read records are reduced to a stratified
+    subset (see ``lrseq.sampling``) and short reads are only fetched for the
+    sampled biosamples.  Otherwise short reads come from ``catalogue`` (a
+    ``lrseq.catalogue.ShortReadCatalogue``) if given, or are downloaded.
+    """
+    tax_id = TAX_IDS[data_type]
+    with stage("long_reads"):
+        try:
+            records = fetch_long_read_records(tax_id, strict=True)
+        except RuntimeError as exc:
+            logger.error(f"Long reads for {data_type} unavailable ({exc}) — keeping the previous data.")
+            return DatasetResult()
+    if not records:
+        logger.error(f"ENA returned no long-read runs for {data_type} — keeping the previous data.")
+        return DatasetResult()
+    if sample_size is not None:
+        with stage("sample"):
+            records = stratified_sample(records, sample_size, seed)
+
+    with stage("index"):
+        long_by_sample = index_by_sample(runs_from_records(records))
+    if not long_by_sample:
+        logger.error(f"No long-read data retrieved for {data_type} — skipping hybrid detection.")
+        return DatasetResult(records=records)
+
+    with stage("short_reads"):
+        if sample_size is not None:
+            logger.info(f"Fetching short-read runs for {len(long_by_sample):,} sampled biosamples...")
+            short_by_sample = fetch_run_index_for_samples(SHORT_READ_PLATFORMS, long_by_sample)
+        elif catalogue is not None and catalogue.covers(tax_id):
+            short_by_sample = catalogue.lookup(long_by_sample)
+        else:
+            if catalogue is not None:
+                logger.warning(f"Short-read catalogue has no rows for tax_id={tax_id} — fetching directly.")
+            logger.info(f"Fetching short-read runs for tax_id={tax_id}...")
+            try:
+                short_by_sample = fetch_run_index(SHORT_READ_PLATFORMS, tax_id, samples=long_by_sample, strict=True)
+            except RuntimeError as exc:
+                logger.error(f"Short reads for {data_type} unavailable ({exc}) — skipping hybrid detection.")
+                return DatasetResult(records=records)
+    with stage("find_hybrids"):
+        hybrids = find_hybrid_samples(long_by_sample, short_by_sample)
+    return DatasetResult(records=records, hybrids=hybrids)
+
+
+def run_pipeline(output_dir: str = "genome-dashboard", plots: bool = True,
+                 sample_size: Optional[int] = None, seed: int = 0, growth_freq: str = "W",
+                 snapshot_dir: Optional[str] = None, catalogue_dir: Optional[str] = None) -> dict:
+    """
+    Build both datasets, write the dashboard files to ``output_dir`` and, if
+    ``plots`` is set, update the sample-count history and plots.
+
+    ``sample_size``/``seed`` select a stratified development subset per
+    dataset; sampled runs must write outside the dashboard directory so the
+    served data and plots are not replaced, and skip the sample-count history.
+    ``growth_freq`` is the resolution of the first_public growth plot.
+    With ``snapshot_dir`` the datasets are also committed to the snapshot
+    store (see ``lrseq.snapshots``) under today's date, unless their fetch failed.
+    With ``catalogue_dir`` short reads come from the persistent short-read
+    catalogue (see ``lrseq.catalogue``), refreshed once for both taxa.
+
+    Returns {data_type: DatasetResult}.
+    """
+    if sample_size is not None and os.path.abspath(output_dir) == DASHBOARD_DIR:
+        raise ValueError(f"Sampled runs must not write to the dashboard directory {output_dir}")
+    os.makedirs(os.path.join(output_dir, "assets"), exist_ok=True)
+
+    start = time.time()
+    catalogue = None
+    if catalogue_dir and sample_size is None:
+        from .catalogue import refresh_catalogue
+        with stage("catalogue"):
+            catalogue = refresh_catalogue(catalogue_dir, [TAX_IDS[t] for t in DATA_FILES])
+
+    results = {}
+    for data_type, data_file in DATA_FILES.items():
+        data_path = os.path.join(output_dir, data_file)
+        with stage(data_type):
+            result = build_dataset(data_type, sample_size, seed, catalogue)
+            fetched = result.records is not None
+            # Keep the previous files if a stage was skipped
+            if fetched:
+                save_json_gz(result.records, data_path)
+            else:
+                # Plots below describe the data that is still served
+                result.records = load_json_gz(data_path)
+            if result.hybrids is not None:
+                save_json_gz(result.hybrids, os.path.join(output_dir, f"hybrid_{data_type}.json.gz"))
+        hybrids = ("hybrid detection skipped" if result.hybrids is None
+                   else f"{len(result.hybrids):,} hybrid biosamples")
+        logger.info(f"{data_type}: {len(result.records):,} records{'' if fetched else ' (previous)'}, {hybrids}")
+        results[data_type] = result
+
+        # Only fetched data is committed, so an outage never shows up as removals
+        if snapshot_dir and sample_size is None and fetched:
+            today = datetime.now().strftime("%Y-%m-%d")
+            with stage("snapshots"):
+                open_store(snapshot_dir, data_file[:-len(".json.gz")]).commit(today, result.records)
+                if result.hybrids:
+                    open_store(snapshot_dir, f"hybrid_{data_type}").commit(today, result.hybrids)
+
+    if plots:
+        with stage("plots"):
+            # matplotlib/pandas are only needed for this stage
+            from .growth import build_growth_table
+            from .plots import generate_growth_plot, generate_organism_bubble_plot, generate_plot, update_sample_counts
+
+            csv_file = os.path.join(output_dir, "sample_counts.csv")
+            wgs, mgx = results["wgs"], results["mgx"]
+            if sample_size is None:
+                # None repeats the previous hybrid count when detection was skipped
+                update_sample_counts(csv_file, len(wgs.records), len(mgx.records),
+                                     None if wgs.hybrids is None else len(wgs.hybrids),
+                                     None if mgx.hybrids is None else len(mgx.hybrids))
+                generate_plot(csv_file, os.path.join(output_dir, "assets", "sample_plot.png"))
+            generate_organism_bubble_plot(wgs.records, mgx.records,
+                                          os.path.join(output_dir, "assets", "organism_bubble_plot.png"))
+
+            growth = build_growth_table({"wgs": wgs.records, "mgx": mgx.records})
+            if not growth.empty:
+                growth.to_csv(os.path.join(output_dir, "sample_growth.csv"))
+            generate_growth_plot(growth, os.path.join(output_dir, "assets", "sample_growth_plot.png"), growth_freq)
+
+    logger.info(f"Pipeline done in {time.time() - start:.1f}s")
+    return results
@@ -0,0 +1,329 @@
+"""
+Opt-in per-stage profiling for the pipeline scripts.
+
+Library code marks its stages with ``stage(name)``; this is a no-op unless a
+script wraps its run in ``profile_run(prefix)`` (the ``--profile`` flag).
+While a run is profiled:
+
+* a background thread samples the main thread's stack every few
+  milliseconds.  Samples are wall-clock, so time spent waiting on ENA shows
+  up as ``requests``/socket frames next to decode and indexing time.
+* tracemalloc records each stage's peak traced memory, and the allocation
+  sites that grew during each top-level stage.
+
+Stages nest (``short_reads;ena.download``) and repeated entries accumulate.
+On exit the run writes, next to the script's output::
+
+    <prefix>.profile.folded   collapsed stacks, stage path as the root frames
+                              (flamegraph.pl, speedscope, inferno, ...)
+    <prefix>.profile.svg      the same stacks as a self-contained flame graph
+    <prefix>.profile.txt      per-stage wall/CPU time, peak memory, hottest
+                              functions and top allocation sites
+    <prefix>.profile.json     the same summary, for comparing runs
+
+Only the main process is profiled; ENA parse workers (``lrseq.parse``) show
+up as the time the main thread spends waiting for them.  Forked workers would
+inherit tracemalloc tracing and decode several times slower, so pools start
+them with ``worker_initializer``; their CPU time and allocations are not
+captured.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Optional
+from xml.sax.saxutils import escape
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = 0.005
+
+# Rows of the text report per stage
+TOP_N = 15
+
+# Stage depth up to which allocation sites are diffed; a snapshot costs
+# seconds on a heap of millions of records, nested stages only track peaks
+ALLOCATION_DEPTH = 1
+
+_active = None
+
+
+def report_prefix(output_path: str) -> str:
+    """``dir/hybrid_wgs.json.gz`` → ``dir/hybrid_wgs`` (reports go next to the output)."""
+    root, ext = os.path.splitext(output_path)
+    if ext == ".gz":
+        root = os.path.splitext(root)[0]
+    return root
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Stats:
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.peak = 0
+        self.allocations = Counter()   # site → bytes grown
+        self.allocation_counts = Counter()
+
+
+class _OpenStage:
+    def __init__(self, path: tuple, snapshot, held: int, overhead: tuple):
+        self.path = path
+        self.snapshot = snapshot
+        self.held = held            # traced bytes taken by ``snapshot`` itself
+        self.overhead = overhead    # profiler bookkeeping time when the stage started
+        self.peak = 0               # peak carried up from finished child stages
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+
+# Allocation sites belonging to the profiler's own snapshots
+_OWN_FILES = {tracemalloc.__file__, __file__}
+
+
+class Profiler:
+    """
+    Stack sampler plus per-stage tracemalloc accounting for one run.
+
+    Taking and comparing snapshots is slow on a large heap, so the sampler
+    pauses while it happens and the time is subtracted from the stages; the
+    memory held by open stages' snapshots is subtracted from their peaks.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()        # collapsed stack → samples
+        self.stats = defaultdict(_Stats)
+        self._path = ()                 # current stage path, replaced (not mutated) for the sampler
+        self._open = []
+        self._held = 0
+        self._overhead = (0.0, 0.0)     # wall, cpu seconds spent in bookkeeping
+        self._paused = False
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="lrseq-profiler", daemon=True)
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._sampler.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self._paused:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.samples[";".join(self._path + tuple(reversed(stack)))] += 1
+
+    def _add_overhead(self, wall: float, cpu: float) -> None:
+        self._overhead = (self._overhead[0] + time.perf_counter() - wall,
+                          self._overhead[1] + time.process_time() - cpu)
+
+    def enter(self, name: str) -> None:
+        wall, cpu = time.perf_counter(), time.process_time()
+        self._paused = True
+        if self._open:
+            parent = self._open[-1]
+            parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1] - self._held)
+        snapshot, held = None, 0
+        if len(self._open) < ALLOCATION_DEPTH:
+            before = tracemalloc.get_traced_memory()[0]
+            snapshot = tracemalloc.take_snapshot()
+            held = tracemalloc.get_traced_memory()[0] - before
+        self._held += held
+        tracemalloc.reset_peak()
+        self._path = self._path + (name,)
+        self._add_overhead(wall, cpu)
+        self._open.append(_OpenStage(self._path, snapshot, held, self._overhead))
+        self._paused = False
+
+    def exit(self) -> None:
+        wall, cpu = time.perf_counter(), time.process_time()
+        self._paused = True
+        stage = self._open.pop()
+        peak = max(stage.peak, tracemalloc.get_traced_memory()[1] - self._held)
+        stats = self.stats[";".join(stage.path)]
+        stats.calls += 1
+        stats.wall += wall - stage.wall - (self._overhead[0] - stage.overhead[0])
+        stats.cpu += cpu - stage.cpu - (self._overhead[1] - stage.overhead[1])
+        stats.peak = max(stats.peak, peak)
+        if stage.snapshot is not None:
+            for diff in tracemalloc.take_snapshot().compare_to(stage.snapshot, "lineno"):
+                frame = diff.traceback[0]
+                if diff.size_diff > 0 and frame.filename not in _OWN_FILES:
+                    site = f"{frame.filename}:{frame.lineno}"
+                    stats.allocations[site] += diff.size_diff
+                    stats.allocation_counts[site] += diff.count_diff
+
+        stage.snapshot = None
+        self._held -= stage.held
+        self._path = stage.path[:-1]
+        if self._open:
+            self._open[-1].peak = max(self._open[-1].peak, peak)
+        tracemalloc.reset_peak()
+        self._add_overhead(wall, cpu)
+        self._paused = False
+
+    def summary(self) -> dict:
+        """Per-stage totals, hottest functions (self samples) and top allocation sites."""
+        self_samples = defaultdict(Counter)
+        for stack, count in self.samples.items():
+            frames = stack.split(";")
+            depth = next((i for i in range(len(frames), 0, -1) if ";".join(frames[:i]) in self.stats), 0)
+            self_samples[";".join(frames[:depth])][frames[-1]] += count
+
+        stages = {}
+        for name, s in sorted(self.stats.items()):
+            stages[name] = {
+                "calls": s.calls,
+                "wall_s": round(s.wall, 3),
+                "cpu_s": round(s.cpu, 3),
+                "samples": sum(c for stack, c in self.samples.items()
+                               if stack == name or stack.startswith(name + ";")),
+                "peak_mb": round(s.peak / 2**20, 1),
+                "top_functions": [{"function": f, "samples": c} for f, c in self_samples[name].most_common(TOP_N)],
+                "top_allocators": [{"site": site, "kb": round(size / 1024, 1), "blocks": s.allocation_counts[site]}
+                                   for site, size in s.allocations.most_common(TOP_N)],
+            }
+        return {"interval_s": self.interval, "total_samples": sum(self.samples.values()), "stages": stages}
+
+    def write(self, prefix: str) -> None:
+        """Write the folded stacks, flame graph and summary reports to ``<prefix>.profile.*``."""
+        os.makedirs(os.path.dirname(prefix) or ".", exist_ok=True)
+        with open(f"{prefix}.profile.folded", "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+        with open(f"{prefix}.profile.svg", "w", encoding="utf-8") as f:
+            f.write(render_flamegraph(self.samples, os.path.basename(prefix)))
+
+        summary = self.summary()
+        with open(f"{prefix}.profile.json", "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=1)
+        with open(f"{prefix}.profile.txt", "w", encoding="utf-8") as f:
+            f.write(_format_summary(summary))
+        logger.info(f"Profile written to {prefix}.profile.{{folded,svg,txt,json}}")
+
+
+def _format_summary(summary: dict) -> str:
+    lines = [f"{'stage':<40} {'calls':>5} {'wall s':>8} {'cpu s':>8} {'samples':>8} {'peak MB':>8}"]
+    for name, s in summary["stages"].items():
+        lines.append(f"{name:<40} {s['calls']:>5} {s['wall_s']:>8.2f} {s['cpu_s']:>8.2f} "
+                     f"{s['samples']:>8} {s['peak_mb']:>8.1f}")
+    for name, s in summary["stages"].items():
+        lines += ["", f"== {name}", "  hottest functions (self samples):"]
+        lines += [f"    {t['samples']:>7}  {t['function']}" for t in s["top_functions"]]
+        if s["top_allocators"]:
+            lines.append("  top allocation sites (KiB grown, blocks):")
+            lines += [f"    {t['kb']:>10.1f} {t['blocks']:>8}  {t['site']}" for t in s["top_allocators"]]
+    return "\n".join(lines) + "\n"
+
+
+def render_flamegraph(samples: Counter, title: str = "", width: int = 1200) -> str:
+    """Render collapsed stacks as a standalone SVG flame graph (root at the bottom)."""
+    tree = {}
+    for stack, count in samples.items():
+        node = tree
+        for frame in stack.split(";"):
+            entry = node.setdefault(frame, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    def depth(node):
+        return 1 + max((depth(child) for _, child in node.values()), default=0)
+
+    row = 16
+    total = sum(samples.values()) or 1
+    height = (depth(tree) + 1) * row + 24
+    rects = []
+
+    def draw(node, x, level):
+        for frame, (count, children) in sorted(node.items()):
+            w = count / total * width
+            if w >= 0.1:
+                y = height - (level + 1) * row
+                hue = zlib.crc32(frame.encode("utf-8")) % 60
+                label = escape(frame)
+                text = escape(frame[:int(w / 7)]) if w > 21 else ""
+                rects.append(
+                    f'<g><title>{label} ({count} samples, {100 * count / total:.1f}%)</title>'
+                    f'<rect x="{x:.1f}" y="{y}" width="{w:.1f}" height="{row - 1}" fill="hsl({hue},85%,60%)"/>'
+                    f'<text x="{x + 3:.1f}" y="{y + row - 4}">{text}</text></g>'
+                )
+                draw(children, x, level + 1)
+            x += w
+
+    draw(tree, 0.0, 0)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">'
+        f'<text x="4" y="14" font-size="13">{escape(title)} — {total} samples</text>'
+        + "".join(rects) + "</svg>\n"
+    )
+
+
+def worker_initializer() -> None:
+    """Process pool initializer: stop the tracemalloc tracing a forked worker inherits."""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def add_profile_argument(parser, report: str, location: str = "next to the output") -> None:
+    """Add the ``--profile`` flag to a script's argparse parser; ``report`` names the report prefix."""
+    parser.add_argument("--profile", action="store_true",
+                        help=f"Profile each stage and write {report}.profile.{{folded,svg,txt,json}} "
+                             f"(sampled stacks, flame graph, top allocators) {location}.")
+
+
+@contextmanager
+def stage(name: str):
+    """Attribute the enclosed block to stage ``name`` when a run is being profiled."""
+    profiler = _active
+    if profiler is None or threading.get_ident() != profiler._thread_id:
+        yield
+        return
+    profiler.enter(name)
+    try:
+        yield
+    finally:
+        profiler.exit()
+
+
+@contextmanager
+def profile_run(prefix: str, enabled: bool = True, interval: Optional[float] = None):
+    """Profile the enclosed run and write ``<prefix>.profile.*`` reports when it ends."""
+    global _active
+    if not enabled or _active is not None:
+        yield
+        return
+    profiler = Profiler(interval or SAMPLE_INTERVAL)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+        profiler.write(prefix)
@@ -0,0 +1,97 @@
+"""
+Deterministic stratified sampling of dashboard records for development runs.
+
+Records are grouped into units by biosample, so every run of a chosen
+biosample is kept and hybrid long/short pairs stay intact.  Units are
+stratified by (organism, platform, library strategy) and each stratum gets a
+share of the requested size proportional to its record count (largest
+remainder).  Within a stratum units are ranked by a seeded hash of their ID,
+so the same seed picks the same biosamples regardless of input order.
+"""
+
+import hashlib
+import logging
+from collections import defaultdict
+from typing import Iterable
+
+from .hybrid import is_valid_sample
+
+logger = logging.getLogger(__name__)
+
+
+def _rank(seed: int, key: str) -> bytes:
+    return hashlib.blake2b(f"{seed}:{key}".encode("utf-8"), digest_size=8).digest()
+
+
+def unit_key(record: dict) -> str:
+    """Biosample ID, or the run ID for records without a usable biosample."""
+    sa = (record.get("sample_accession") or "").strip()
+    return sa if is_valid_sample(sa) else f"run:{record.get('sample_id', '')}"
+
+
+def stratum_key(record: dict) -> tuple:
+    return (
+        record.get("scientific_name") or "Unknown",
+        record.get("instrument_platform") or "",
+        record.get("library_strategy") or "Unknown",
+    )
+
+
+def allocate(stratum_sizes: dict, size: int, seed: int = 0) -> dict:
+    """
+    Split ``size`` across strata proportionally to ``stratum_sizes`` using the
+    largest-remainder method; ties are broken by a seeded hash of the stratum.
+    """
+    total = sum(stratum_sizes.values())
+    if total <= size:
+        return dict(stratum_sizes)
+    quotas = {}
+    remainders = []
+    for key, n in stratum_sizes.items():
+        exact = size * n / total
+        quotas[key] = int(exact)
+        remainders.append((-(exact - int(exact)), _rank(seed, repr(key)), key))
+    for _, _, key in sorted(remainders)[:size - sum(quotas.values())]:
+        quotas[key] += 1
+    return quotas
+
+
+def stratified_sample(records: Iterable[dict], size: int, seed: int = 0) -> list:
+    """
+    Return a reproducible stratified subset of about ``size`` records.
+
+    Whole biosamples are kept; a biosample that does not fit in its stratum's
+    quota is skipped, so the result can fall slightly short of ``size``.
+    Records keep their full schema and original relative order.
+    """
+    records = list(records)
+    units = defaultdict(list)
+    for i, record in enumerate(records):
+        units[unit_key(record)].append(i)
+
+    strata = defaultdict(list)
+    stratum_sizes = defaultdict(int)
+    for key, rows in units.items():
+        # A biosample's stratum is taken from its lowest run ID
+        first = min(rows, key=lambda i: records[i].get("sample_id") or "")
+        stratum = stratum_key(records[first])
+        strata[stratum].append(key)
+        stratum_sizes[stratum] += len(rows)
+
+    quotas = allocate(stratum_sizes, size, seed)
+    chosen = []
+    for stratum, quota in quotas.items():
+        taken = 0
+        for key in sorted(strata[stratum], key=lambda k: _rank(seed, k)):
+            if taken >= quota:
+                break
+            # Skip biosamples that would overshoot the quota rather than split them
+            if taken + len(units[key]) > quota:
+                continue
+            chosen.extend(units[key])
+            taken += len(units[key])
+
+    chosen.sort()
+    logger.info(f"Sampled {len(chosen):,} of {len(records):,} records "
+                f"({sum(1 for q in quotas.values() if q):,} of {len(quotas):,} strata, seed={seed})")
+    return [records[i] for i in chosen]
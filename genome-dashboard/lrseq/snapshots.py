@@ -0,0 +1,225 @@
+"""
+Delta storage for weekly dataset snapshots.
+
+Each dataset (e.g. ``data_bacteria``) lives in its own directory as a list of
+segments.  A segment is a full base snapshot, sorted by key, followed by the
+weekly deltas on top of it::
+
+    snapshots/data_bacteria/
+        manifest.json
+        2026-10-18.base.json.gz
+        2026-10-25.delta.json.gz      {"added": [...], "changed": [...], "removed": [...]}
+        ...
+
+``added``/``changed`` hold full records, ``removed`` only keys, so one delta
+file is also the week-over-week diff (new bases keep one alongside them).
+After ``compact_every`` deltas, or when the record fields change (a delta
+would then rewrite every record), the next commit starts a new segment with
+a fresh base, which bounds rebuild cost; ``prune()`` drops old segments when
+the history is no longer needed.
+"""
+
+import gzip
+import json
+import logging
+import os
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+
+# Dataset name → record key
+DATASET_KEYS = {
+    "data_bacteria": "sample_id",
+    "data_metagenome": "sample_id",
+    "hybrid_wgs": "biosample",
+    "hybrid_mgx": "biosample",
+}
+
+
+def _read_json_gz(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json_gz(obj, path: str) -> None:
+    # mtime=0 keeps the bytes identical for identical content, so git sees no change
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as gz:
+        gz.write(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+def _fields(state: dict) -> set:
+    """All record fields present in a {key: record} state."""
+    fields = set()
+    for r in state.values():
+        fields.update(r)
+    return fields
+
+
+class SnapshotStore:
+    """Base + delta history of one dataset, keyed by ``key``."""
+
+    def __init__(self, path: str, key: str, compact_every: int = 8):
+        self.path = path
+        self.key = key
+        self.compact_every = compact_every
+        manifest_path = os.path.join(path, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest["key"] != key:
+                raise ValueError(f"{path} is keyed by {manifest['key']!r}, not {key!r}")
+            self.segments = manifest["segments"]
+        else:
+            self.segments = []
+
+    # ------------------------------------------------------------------ #
+    # Reading                                                              #
+    # ------------------------------------------------------------------ #
+    def dates(self) -> list:
+        """All snapshot dates, oldest first."""
+        return [d for seg in self.segments for d in [seg["base"]] + seg["deltas"]]
+
+    def latest(self) -> Optional[str]:
+        dates = self.dates()
+        return dates[-1] if dates else None
+
+    def _file(self, date: str, kind: str) -> str:
+        return os.path.join(self.path, f"{date}.{kind}.json.gz")
+
+    def load_delta(self, date: str) -> dict:
+        """
+        The changes committed on ``date`` relative to the previous snapshot.
+        Bases store one too (not applied on load) so every week has a cheap diff;
+        only the very first snapshot has none.
+        """
+        path = self._file(date, "delta")
+        if not os.path.exists(path):
+            return {"added": [], "changed": [], "removed": []}
+        return _read_json_gz(path)
+
+    def _state(self, date: Optional[str] = None) -> dict:
+        if not self.segments:
+            raise KeyError(f"No snapshots in {self.path}")
+        date = date or self.latest()
+        segment = next((s for s in reversed(self.segments) if s["base"] <= date), None)
+        if segment is None or date not in [segment["base"]] + segment["deltas"]:
+            raise KeyError(f"No snapshot for {date} in {self.path}")
+        state = {r[self.key]: r for r in _read_json_gz(self._file(segment["base"], "base"))}
+        for delta_date in segment["deltas"]:
+            if delta_date > date:
+                break
+            delta = self.load_delta(delta_date)
+            for k in delta["removed"]:
+                state.pop(k, None)
+            for r in delta["added"] + delta["changed"]:
+                state[r[self.key]] = r
+        return state
+
+    def load(self, date: Optional[str] = None) -> list:
+        """Rebuild the dataset as of ``date`` (default: latest), sorted by key."""
+        state = self._state(date)
+        return [state[k] for k in sorted(state)]
+
+    def diff(self, old_date: str, new_date: str) -> dict:
+        """Return {"added", "changed", "removed"} keys between two snapshots."""
+        dates = self.dates()
+        if dates.index(new_date) == dates.index(old_date) + 1:
+            # Adjacent snapshots: the stored delta already is the diff
+            delta = self.load_delta(new_date)
+            return {
+                "added": [r[self.key] for r in delta["added"]],
+                "changed": [r[self.key] for r in delta["changed"]],
+                "removed": list(delta["removed"]),
+            }
+        old, new = self._state(old_date), self._state(new_date)
+        return {
+            "added": sorted(set(new) - set(old)),
+            "changed": sorted(k for k in set(new) & set(old) if new[k] != old[k]),
+            "removed": sorted(set(old) - set(new)),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Writing                                                              #
+    # ------------------------------------------------------------------ #
+    def _save_manifest(self) -> None:
+        with open(os.path.join(self.path, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "segments": self.segments}, f, indent=1)
+
+    def _remove(self, date: str) -> None:
+        for kind in ("base", "delta"):
+            if os.path.exists(self._file(date, kind)):
+                os.remove(self._file(date, kind))
+
+    def _drop_latest(self) -> None:
+        segment = self.segments[-1]
+        if segment["deltas"]:
+            self._remove(segment["deltas"].pop())
+        else:
+            self._remove(segment["base"])
+            self.segments.pop()
+
+    def commit(self, date: str, records: Iterable[dict]) -> dict:
+        """
+        Record ``records`` as the snapshot for ``date`` (ISO format) and return
+        the stored delta.  Re-committing the latest date replaces it.  An empty
+        record set is refused: it means a failed fetch, not an empty dataset.
+        """
+        new = {r[self.key]: r for r in records}
+        if not new:
+            raise ValueError(f"Refusing to commit an empty snapshot to {self.path}")
+        os.makedirs(self.path, exist_ok=True)
+        latest = self.latest()
+        if latest is not None and date < latest:
+            raise ValueError(f"{date} is older than the latest snapshot {latest}")
+        if date == latest:
+            self._drop_latest()
+
+        previous = self._state() if self.segments else {}
+        old_fields, new_fields = _fields(previous), _fields(new)
+        schema_changed = bool(previous) and old_fields != new_fields
+
+        if not self.segments or len(self.segments[-1]["deltas"]) >= self.compact_every or schema_changed:
+            self.segments.append({"base": date, "deltas": []})
+            _write_json_gz([new[k] for k in sorted(new)], self._file(date, "base"))
+            # Across a schema change only the shared fields count as a change
+            delta = self._delta(previous, new, old_fields & new_fields if schema_changed else None)
+            if previous:
+                _write_json_gz(delta, self._file(date, "delta"))
+            reason = " (record fields changed)" if schema_changed else ""
+            logger.info(f"{self.path}: new base {date}{reason} ({len(new):,} records)")
+        else:
+            delta = self._delta(previous, new)
+            self.segments[-1]["deltas"].append(date)
+            _write_json_gz(delta, self._file(date, "delta"))
+            logger.info(f"{self.path}: delta {date} (+{len(delta['added']):,} "
+                        f"~{len(delta['changed']):,} -{len(delta['removed']):,})")
+        self._save_manifest()
+        return delta
+
+    def _delta(self, old: dict, new: dict, fields: Optional[set] = None) -> dict:
+        added = sorted(set(new) - set(old))
+        if fields is None:
+            changed = sorted(k for k in set(new) & set(old) if new[k] != old[k])
+        else:
+            changed = sorted(k for k in set(new) & set(old)
+                             if any(new[k].get(f) != old[k].get(f) for f in fields))
+        return {
+            "added": [new[k] for k in added],
+            "changed": [new[k] for k in changed],
+            "removed": sorted(set(old) - set(new)),
+        }
+
+    def prune(self, keep_segments: int) -> None:
+        """Delete all but the newest ``keep_segments`` segments."""
+        while len(self.segments) > max(keep_segments, 1):
+            segment = self.segments.pop(0)
+            for d in [segment["base"]] + segment["deltas"]:
+                self._remove(d)
+        self._save_manifest()
+
+
+def open_store(root: str, name: str, compact_every: int = 8) -> SnapshotStore:
+    """Open the store for one of the dashboard datasets in DATASET_KEYS."""
+    return SnapshotStore(os.path.join(root, name), DATASET_KEYS[name], compact_every)
@@ -0,0 +1,47 @@
+import argparse
+import logging
+import os
+
+from lrseq.parse import add_parse_arguments, configure as configure_parsing
+from lrseq.pipeline import run_pipeline
+from lrseq.profiling import add_profile_argument, profile_run
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fetch ENA long-read data, find hybrid biosamples and update plots in one process."
+    )
+    parser.add_argument("--output-dir", default=None,
+                        help="Dashboard directory. Default: genome-dashboard; required with --sample-size, "
+                             "which must not replace the served data and plots.")
+    parser.add_argument("--no-plots", action="store_true", help="Skip the sample-count history and plots.")
+    parser.add_argument("--sample-size", type=int, default=None,
+                        help="Build a reproducible stratified subset of about this many long-read records "
+                             "per dataset for development runs.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for --sample-size. Default: 0.")
+    parser.add_argument("--growth-freq", default="W",
+                        help="Resolution of the first_public growth plot as a pandas offset alias "
+                             "(D, W, MS, QS, ...). Default: W.")
+    parser.add_argument("--snapshot-dir", default=None,
+                        help="Also commit the datasets to this snapshot store (e.g. genome-dashboard/snapshots).")
+    parser.add_argument("--short-read-catalogue", default=None,
+                        help="Directory of the persistent short-read biosample catalogue; only runs updated "
+                             "since its last refresh are downloaded.")
+    add_profile_argument(parser, "pipeline", "next to the dashboard files")
+    add_parse_arguments(parser)
+    args = parser.parse_args()
+    if args.sample_size is not None and args.output_dir is None:
+        parser.error("--sample-size needs an --output-dir outside genome-dashboard/")
+    output_dir = args.output_dir or "genome-dashboard"
+    configure_parsing(args.parse_workers, args.memory_budget_mb)
+
+    with profile_run(os.path.join(output_dir, "pipeline"), enabled=args.profile):
+        run_pipeline(output_dir, plots=not args.no_plots, sample_size=args.sample_size, seed=args.seed,
+                     growth_freq=args.growth_freq, snapshot_dir=args.snapshot_dir,
+                     catalogue_dir=args.short_read_catalogue)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Build a compact organism search index for a dashboard data file.
+
+The dashboard organism filters do a substring match on ``scientific_name``.
+Scanning every row on each keystroke gets slow with 100 k+ records, so this
+script precomputes, per data file:
+
+* the distinct normalised organism names (sorted),
+* a trigram postings list over those names, and
+* the row ids (positions in the data array) for every name.
+
+The browser intersects the trigram postings of the query, verifies the few
+candidate names, and unions their row ids — no full table scan.
+
+Integer lists are delta-encoded to keep the gzip output small.  The index is
+written next to its input as ``<name>.index.json.gz``.
+"""
+
+import argparse
+import gzip
+import json
+import logging
+import os
+from collections import defaultdict
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+INDEX_FIELD = "scientific_name"
+NGRAM = 3
+
+
+def normalize_name(name) -> str:
+    """Lower-case and collapse whitespace; must match normalizeQuery() in organism_search.js."""
+    if not isinstance(name, str):
+        return ""
+    return " ".join(name.lower().split())
+
+
+def trigrams(text: str) -> set:
+    """Return the set of character trigrams of ``text`` (empty for shorter strings)."""
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def delta_encode(values: list) -> list:
+    """Encode a sorted list of ints as first value + successive differences."""
+    out = []
+    prev = 0
+    for v in values:
+        out.append(v - prev)
+        prev = v
+    return out
+
+
+def delta_decode(values: list) -> list:
+    """Inverse of delta_encode()."""
+    out = []
+    acc = 0
+    for v in values:
+        acc += v
+        out.append(acc)
+    return out
+
+
+def build_index(records: list, field: str = INDEX_FIELD) -> dict:
+    """
+    Build the search index for a list of record dicts.
+
+    Row ids are positions in ``records``, so the index is only valid for the
+    exact file it was built from; ``n_rows`` lets the client check that.
+    """
+    rows_by_name = defaultdict(list)
+    for row_id, record in enumerate(records):
+        name = normalize_name(record.get(field))
+        if name:
+            rows_by_name[name].append(row_id)
+
+    names = sorted(rows_by_name)
+    postings = defaultdict(list)
+    for name_id, name in enumerate(names):
+        for gram in trigrams(name):
+            postings[gram].append(name_id)
+
+    return {
+        "version": INDEX_VERSION,
+        "field": field,
+        "n_rows": len(records),
+        "names": names,
+        "rows": [delta_encode(rows_by_name[name]) for name in names],
+        "trigrams": {gram: delta_encode(ids) for gram, ids in sorted(postings.items())},
+    }
+
+
+def search_index(index: dict, query: str) -> list:
+    """
+    Resolve a substring query against an index; returns sorted row ids.
+
+    Reference implementation of queryOrganismIndex() in organism_search.js.
+    """
+    q = normalize_name(query)
+    names = index["names"]
+    if not q:
+        return list(range(index["n_rows"]))
+    if len(q) < NGRAM:
+        candidates = range(len(names))
+    else:
+        candidates = None
+        for gram in trigrams(q):
+            ids = set(delta_decode(index["trigrams"].get(gram, [])))
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+    rows = []
+    for name_id in candidates:
+        if q in names[name_id]:
+            rows.extend(delta_decode(index["rows"][name_id]))
+    return sorted(rows)
+
+
+def index_path_for(data_path: str) -> str:
+    """``data_bacteria.json.gz`` → ``data_bacteria.index.json.gz``."""
+    if data_path.endswith(".json.gz"):
+        return data_path[:-len(".json.gz")] + ".index.json.gz"
+    return data_path + ".index.json.gz"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build organism search indexes for dashboard data files.")
+    parser.add_argument("inputs", nargs="+", help="Input .json.gz data files.")
+    args = parser.parse_args()
+
+    for path in args.inputs:
+        if not os.path.exists(path):
+            logger.warning(f"{path} not found — skipping.")
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = json.load(f)
+        index = build_index(records)
+        out_path = index_path_for(path)
+        with gzip.open(out_path, "wt", encoding="utf-8") as f:
+            json.dump(index, f, separators=(",", ":"))
+        logger.info(f"{out_path}: {len(index['names']):,} organisms, "
+                    f"{len(index['trigrams']):,} trigrams, {index['n_rows']:,} rows")
+
+
+if __name__ == "__main__":
+    main()
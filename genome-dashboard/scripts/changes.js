@@ -0,0 +1,30 @@
+// Week-over-week change counts on the landing page cards.
+//
+// The deploy workflow writes <dataset>.changes.json next to each data file
+// (scripts/snapshot_store.py materialize): the snapshot date, the previous
+// snapshot date and the added/changed/removed keys between them.
+
+async function loadChanges(dataset) {
+  try {
+    const response = await fetch(`${dataset}.changes.json`);
+    if (!response.ok) return null;
+    return await response.json();
+  } catch (err) {
+    console.warn(`Changes for ${dataset} unavailable:`, err);
+    return null;
+  }
+}
+
+function describeChanges(changes, unit) {
+  const count = key => (changes[key] || []).length.toLocaleString();
+  return `+${count('added')} ${unit}, ${count('changed')} updated, ` +
+         `${count('removed')} removed since ${changes.previous}`;
+}
+
+document.querySelectorAll('.card-changes[data-dataset]').forEach(async el => {
+  const changes = await loadChanges(el.dataset.dataset);
+  // The first snapshot has nothing to compare against
+  if (!changes || !changes.previous) return;
+  el.textContent = describeChanges(changes, el.dataset.unit || 'new');
+  el.hidden = false;
+});
@@ -1,3 +1,5 @@
+import { indexMatches, indexUrlFor, loadOrganismIndex, queryOrganismIndex } from "./organism_search.js";
+
 document.addEventListener("DOMContentLoaded", () => {
   const urlParams = new URLSearchParams(window.location.search);
   const dataType = urlParams.get('type') || 'wgs'; // Default to wgs
@@ -39,6 +41,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const ampliconFilter = document.getElementById("amplicon-filter");
 
   let allData = [];
+  let organismIndex = null;
 
   function updateProgress(percent, stage, detail) {
     const p = Math.round(percent);
@@ -213,6 +216,10 @@ document.addEventListener("DOMContentLoaded", () => {
     loadingOverlay.style.display = "flex";
     updateProgress(0, "Loading data...", "");
     const url = source === 'bacteria' ? 'data_bacteria.json.gz' : 'data_metagenome.json.gz';
+    // The organism index downloads alongside the data; until it arrives the
+    // organism filter scans rows
+    organismIndex = null;
+    const indexPromise = loadOrganismIndex(indexUrlFor(url));
     try {
       try {
         allData = await loadGzippedJSON(url);
@@ -220,6 +227,12 @@ document.addEventListener("DOMContentLoaded", () => {
         console.warn("Web Worker failed, using main-thread fallback:", workerErr);
         allData = await loadGzippedJSONFallback(url);
       }
+      // Row ids in the organism index are positions in the data file
+      allData.forEach((d, i) => { d._row = i; });
+      const loaded = allData;
+      indexPromise.then(index => {
+        if (allData === loaded && indexMatches(index, loaded)) organismIndex = index;
+      });
 
       // Stage 4: Render table (85–92%)
       await yieldToMain();
@@ -254,7 +267,12 @@ document.addEventListener("DOMContentLoaded", () => {
     const ampliconVal = ampliconFilter.value;
 
     if (organismVal) {
-      filters.push({ field: "scientific_name", type: "like", value: organismVal });
+      if (organismIndex) {
+        const rows = queryOrganismIndex(organismIndex, organismVal);
+        filters.push({ field: data => rows.has(data._row) });
+      } else {
+        filters.push({ field: "scientific_name", type: "like", value: organismVal });
+      }
     }
 
     if (techVal) {
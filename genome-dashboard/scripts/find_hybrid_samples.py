@@ -14,8 +14,19 @@ import logging
 import time
 import argparse
 import os
-import requests
-from collections import defaultdict
+import sys
+
+# Pipeline stages live in the lrseq package one level up (genome-dashboard/lrseq)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.catalogue import refresh_catalogue  # noqa: E402
+from lrseq.ena import (  # noqa: E402
+    LONG_READ_PLATFORMS, SHORT_READ_PLATFORMS, TAX_IDS, fetch_run_index, fetch_run_index_for_samples,
+)
+from lrseq.files import save_json_gz  # noqa: E402
+from lrseq.hybrid import find_hybrid_samples, index_by_sample, runs_from_records  # noqa: E402
+from lrseq.parse import add_parse_arguments, configure as configure_parsing  # noqa: E402
+from lrseq.profiling import add_profile_argument, profile_run, report_prefix, stage  # noqa: E402
 
 logging.basicConfig(
     level=logging.INFO,
@@ -27,72 +38,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-ENA_API_URL = "https://www.ebi.ac.uk/ena/portal/api/search"
-
-LONG_READ_PLATFORMS = ["OXFORD_NANOPORE", "PACBIO_SMRT"]
-
-# All ENA short-read platform codes
-SHORT_READ_PLATFORMS = ["ILLUMINA", "ION_TORRENT", "BGISEQ", "LS454", "COMPLETE_GENOMICS"]
-
-FETCH_FIELDS = "accession,sample_accession,scientific_name,instrument_platform,instrument_model,study_accession,library_strategy"
-
-
-def fetch_ena_platform(platform: str, tax_id: str, retries: int = 3) -> list:
-    """
-    Fetch all runs for a single ENA instrument_platform + taxonomy in one request.
-    Returns a list of dicts with the requested fields.
-    """
-    params = {
-        "result": "read_run",
-        "query": f'instrument_platform="{platform}" AND tax_tree({tax_id})',
-        "fields": FETCH_FIELDS,
-        "format": "json",
-        "limit": 0,
-    }
-    for attempt in range(retries):
-        try:
-            resp = requests.get(ENA_API_URL, params=params, timeout=120)
-            resp.raise_for_status()
-            data = resp.json()
-            logger.info(f"  {platform}: {len(data):,} runs fetched")
-            return data
-        except Exception as exc:
-            wait = 5 * (attempt + 1)
-            logger.warning(f"  {platform} attempt {attempt + 1} failed: {exc}. Retrying in {wait}s...")
-            time.sleep(wait)
-    logger.error(f"  {platform}: all {retries} attempts failed — skipping.")
-    return []
-
-
-def index_by_sample(runs: list) -> dict:
-    """Return {sample_accession: [run_dict, ...]} for non-empty sample accessions."""
-    by_sample = defaultdict(list)
-    for run in runs:
-        sa = (run.get("sample_accession") or "").strip()
-        if sa and sa.upper() not in ("", "N/A", "NONE"):
-            by_sample[sa].append(run)
-    return by_sample
-
-
-def build_run_info(run: dict) -> dict:
-    return {
-        "run_accession": run.get("accession", ""),
-        "instrument_model": run.get("instrument_model", ""),
-        "instrument_platform": run.get("instrument_platform", ""),
-        "study_accession": run.get("study_accession", ""),
-    }
-
-
-def collect_pubmed_ids(runs: list) -> list:
-    """Return a sorted list of unique non-empty PubMed IDs from a list of run dicts."""
-    ids = set()
-    for r in runs:
-        raw = (r.get("pubmed_id") or "").strip()
-        for pid in raw.replace(",", " ").split():
-            if pid:
-                ids.add(pid)
-    return sorted(ids)
-
 
 def load_local_long_reads(filepath: str) -> list:
     """
@@ -102,68 +47,27 @@ def load_local_long_reads(filepath: str) -> list:
     logger.info(f"Loading long-read data from local file: {filepath}")
     with gzip.open(filepath, "rt", encoding="utf-8") as f:
         records = json.load(f)
-    runs = []
-    skipped = 0
-    for r in records:
-        sa = (r.get("sample_accession") or "").strip()
-        if not sa or sa.upper() in ("", "N/A", "NONE"):
-            skipped += 1
-            continue
-        runs.append({
-            "accession": r.get("sample_id", ""),
-            "sample_accession": sa,
-            "scientific_name": r.get("scientific_name", ""),
-            "instrument_platform": r.get("instrument_platform", ""),
-            "instrument_model": r.get("instrument_model", ""),
-            "study_accession": r.get("study_accession", ""),
-            "pubmed_id": r.get("pubmed_id", ""),
-        })
-    logger.info(f"  Loaded {len(runs):,} long-read runs ({skipped:,} skipped — no biosample ID)")
-    return runs
-
+    return runs_from_records(records)
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Find hybrid BioSamples (both long- and short-read) via ENA Portal API."
-    )
-    parser.add_argument(
-        "--type",
-        choices=["wgs", "mgx"],
-        default="mgx",
-        help="'wgs' → bacteria (tax 2), 'mgx' → metagenomes (tax 408169). Default: mgx.",
-    )
-    parser.add_argument(
-        "--output-dir",
-        default=".",
-        help="Directory for the output .json.gz file. Default: current directory.",
-    )
-    parser.add_argument(
-        "--long-reads-file",
-        default=None,
-        help="Path to a local .json.gz file (from extract_ena_genomes.py) to use as the "
-             "long-read dataset instead of querying the ENA API. Must contain "
-             "'sample_accession' and 'instrument_model' fields.",
-    )
-    args = parser.parse_args()
-
-    tax_id = "2" if args.type == "wgs" else "408169"
-    output_file = os.path.join(args.output_dir, f"hybrid_{args.type}.json.gz")
 
+def run(args, tax_id: str, output_file: str) -> None:
+    """Fetch long- and short-read runs, intersect them and write ``output_file``."""
     start = time.time()
 
     # ------------------------------------------------------------------ #
     # 1. Get all long-read runs (local file or ENA API)                    #
     # ------------------------------------------------------------------ #
-    if args.long_reads_file:
-        long_runs = load_local_long_reads(args.long_reads_file)
-    else:
-        logger.info(f"Fetching long-read runs for tax_id={tax_id}...")
-        long_runs = []
-        for platform in LONG_READ_PLATFORMS:
-            long_runs.extend(fetch_ena_platform(platform, tax_id))
-
-    long_by_sample = index_by_sample(long_runs)
-    logger.info(f"Long-read: {len(long_runs):,} runs across {len(long_by_sample):,} unique biosamples")
+    with stage("long_reads"):
+        if args.long_reads_file:
+            long_runs = load_local_long_reads(args.long_reads_file)
+            with stage("index"):
+                long_by_sample = index_by_sample(long_runs)
+        else:
+            logger.info(f"Fetching long-read runs for tax_id={tax_id}...")
+            long_by_sample = fetch_run_index(LONG_READ_PLATFORMS, tax_id)
+
+    long_run_count = sum(len(runs) for runs in long_by_sample.values())
+    logger.info(f"Long-read: {long_run_count:,} runs across {len(long_by_sample):,} unique biosamples")
 
     if not long_by_sample:
         logger.error("No long-read data retrieved — aborting.")
@@ -172,41 +76,40 @@ def main():
     # ------------------------------------------------------------------ #
     # 2. Fetch all short-read runs from ENA                                #
     # ------------------------------------------------------------------ #
-    logger.info(f"Fetching short-read runs for tax_id={tax_id}...")
-    short_runs: list = []
-    for platform in SHORT_READ_PLATFORMS:
-        short_runs.extend(fetch_ena_platform(platform, tax_id))
-
-    short_by_sample = index_by_sample(short_runs)
-    logger.info(f"Short-read: {len(short_runs):,} runs across {len(short_by_sample):,} unique biosamples")
+    with stage("short_reads"):
+        if args.short_reads_by_sample:
+            logger.info(f"Fetching short-read runs for {len(long_by_sample):,} biosamples...")
+            short_by_sample = fetch_run_index_for_samples(SHORT_READ_PLATFORMS, long_by_sample)
+        else:
+            catalogue = refresh_catalogue(args.short_read_catalogue, [tax_id]) if args.short_read_catalogue else None
+            if catalogue is not None and catalogue.covers(tax_id):
+                short_by_sample = catalogue.lookup(long_by_sample)
+            else:
+                if catalogue is not None:
+                    logger.warning(f"Short-read catalogue has no rows for tax_id={tax_id} — fetching directly.")
+                logger.info(f"Fetching short-read runs for tax_id={tax_id}...")
+                # Only short reads of long-read biosamples are kept
+                try:
+                    short_by_sample = fetch_run_index(SHORT_READ_PLATFORMS, tax_id, samples=long_by_sample,
+                                                      strict=True)
+                except RuntimeError as exc:
+                    logger.error(f"Short reads unavailable ({exc}) — keeping the existing {output_file}.")
+                    return
+
+    short_run_count = sum(len(runs) for runs in short_by_sample.values())
+    logger.info(f"Short-read: {short_run_count:,} runs on {len(short_by_sample):,} long-read biosamples")
 
     # ------------------------------------------------------------------ #
     # 3. Intersect by sample_accession                                     #
     # ------------------------------------------------------------------ #
-    hybrid_samples = sorted(set(long_by_sample) & set(short_by_sample))
-    logger.info(f"Hybrid biosamples (long ∩ short): {len(hybrid_samples):,}")
-
-    results = []
-    for sample in hybrid_samples:
-        lr = long_by_sample[sample]
-        sr = short_by_sample[sample]
-        study_accs = list({r.get("study_accession", "") for r in lr + sr} - {""})
-        scientific_name = next((r.get("scientific_name", "") for r in lr if r.get("scientific_name")), "")
-        results.append({
-            "biosample": sample,
-            "scientific_name": scientific_name,
-            "pubmed_ids": collect_pubmed_ids(lr + sr),
-            "long_reads": [build_run_info(r) for r in lr],
-            "short_reads": [build_run_info(r) for r in sr],
-            "study_accession": study_accs,
-        })
+    with stage("find_hybrids"):
+        results = find_hybrid_samples(long_by_sample, short_by_sample)
 
     # ------------------------------------------------------------------ #
     # 4. Save                                                              #
     # ------------------------------------------------------------------ #
     try:
-        with gzip.open(output_file, "wt", encoding="utf-8") as f:
-            json.dump(results, f)
+        save_json_gz(results, output_file)
         logger.info(f"Results saved to {output_file}")
     except Exception as exc:
         logger.error(f"Error saving results: {exc}")
@@ -215,5 +118,52 @@ def main():
     logger.info(f"Done in {elapsed:.1f}s — {len(results):,} hybrid biosamples written.")
 
 
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find hybrid BioSamples (both long- and short-read) via ENA Portal API."
+    )
+    parser.add_argument(
+        "--type",
+        choices=["wgs", "mgx"],
+        default="mgx",
+        help="'wgs' → bacteria (tax 2), 'mgx' → metagenomes (tax 408169). Default: mgx.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="Directory for the output .json.gz file. Default: current directory.",
+    )
+    parser.add_argument(
+        "--long-reads-file",
+        default=None,
+        help="Path to a local .json.gz file (from extract_ena_genomes.py) to use as the "
+             "long-read dataset instead of querying the ENA API. Must contain "
+             "'sample_accession' and 'instrument_model' fields.",
+    )
+    parser.add_argument(
+        "--short-reads-by-sample",
+        action="store_true",
+        help="Query short-read runs only for the biosamples in the long-read dataset instead of "
+             "downloading every short-read run for the taxon. Fast for small inputs such as "
+             "files written with extract_ena_genomes.py --sample-size.",
+    )
+    parser.add_argument(
+        "--short-read-catalogue",
+        default=None,
+        help="Directory of the persistent short-read biosample catalogue shared by --type wgs and "
+             "--type mgx. It is refreshed for this taxon (only runs updated since the last refresh "
+             "are downloaded) and read instead of fetching every short-read run.",
+    )
+    add_profile_argument(parser, "hybrid_<type>")
+    add_parse_arguments(parser)
+    args = parser.parse_args()
+    configure_parsing(args.parse_workers, args.memory_budget_mb)
+
+    tax_id = TAX_IDS[args.type]
+    output_file = os.path.join(args.output_dir, f"hybrid_{args.type}.json.gz")
+    with profile_run(report_prefix(output_file), enabled=args.profile):
+        run(args, tax_id, output_file)
+
+
 if __name__ == "__main__":
     main()
@@ -1,3 +1,5 @@
+import { indexMatches, indexUrlFor, loadOrganismIndex, queryOrganismIndex } from "./organism_search.js";
+
 document.addEventListener("DOMContentLoaded", () => {
   const urlParams = new URLSearchParams(window.location.search);
   let activeType = urlParams.get('type') === 'mgx' ? 'mgx' : 'wgs';
@@ -13,6 +15,7 @@ document.addEventListener("DOMContentLoaded", () => {
   const downloadSelectedBtn = document.getElementById("download-selected-txt");
 
   let allData = [];
+  let organismIndex = null;
 
   // ---- Tab switching ----
   const tabs = document.querySelectorAll(".hybrid-tab");
@@ -265,7 +268,7 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   // ---- Flatten raw hybrid record for table display ----
-  function flattenRecord(record) {
+  function flattenRecord(record, rowId) {
     const longInstruments = [...new Set((record.long_reads || []).map(r => r.instrument_model).filter(Boolean))].join(', ');
     const shortInstruments = [...new Set((record.short_reads || []).map(r => r.instrument_model).filter(Boolean))].join(', ');
     const longPlatforms = [...new Set((record.long_reads || []).map(r => r.instrument_platform).filter(Boolean))].join(', ');
@@ -284,6 +287,7 @@ document.addEventListener("DOMContentLoaded", () => {
       short_run_count: (record.short_reads || []).length,
       study_accessions: studyAccessions,
       // Keep raw for filtering
+      _row: rowId,
       _long_reads: record.long_reads || [],
       _short_reads: record.short_reads || []
     };
@@ -298,6 +302,10 @@ document.addEventListener("DOMContentLoaded", () => {
     table.clearData();
 
     const url = type === 'wgs' ? 'hybrid_wgs.json.gz' : 'hybrid_mgx.json.gz';
+    // The organism index downloads alongside the data; until it arrives the
+    // organism filter scans rows
+    organismIndex = null;
+    const indexPromise = loadOrganismIndex(indexUrlFor(url));
     try {
       let raw;
       try {
@@ -308,6 +316,10 @@ document.addEventListener("DOMContentLoaded", () => {
       }
 
       allData = raw.map(flattenRecord);
+      const loaded = allData;
+      indexPromise.then(index => {
+        if (allData === loaded && indexMatches(index, loaded)) organismIndex = index;
+      });
 
       await yieldToMain();
       updateProgress(87, "Rendering table...", `${allData.length.toLocaleString()} biosamples`);
@@ -349,7 +361,12 @@ document.addEventListener("DOMContentLoaded", () => {
       filtered = filtered.filter(d => d.biosample.toLowerCase().includes(biosampleVal));
     }
     if (organismVal) {
-      filtered = filtered.filter(d => d.scientific_name.toLowerCase().includes(organismVal));
+      if (organismIndex) {
+        const rows = queryOrganismIndex(organismIndex, organismVal);
+        filtered = filtered.filter(d => rows.has(d._row));
+      } else {
+        filtered = filtered.filter(d => d.scientific_name.toLowerCase().includes(organismVal));
+      }
     }
     if (longVal) {
       filtered = filtered.filter(d => matchesTechFilter(d.long_instruments, d.long_platforms, longVal));
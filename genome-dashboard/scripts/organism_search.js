@@ -0,0 +1,116 @@
+// Organism search over the prebuilt index written by build_search_index.py.
+//
+// The index holds the distinct normalised organism names, a trigram postings
+// list over those names and the row ids for each name, so a query only touches
+// a handful of candidate names instead of every row in the table.
+
+const NGRAM = 3;
+
+// Must match normalize_name() in build_search_index.py
+function normalizeQuery(text) {
+  return (text || '').toLowerCase().split(/\s+/).filter(Boolean).join(' ');
+}
+
+function deltaDecode(values) {
+  const out = new Array(values.length);
+  let acc = 0;
+  for (let i = 0; i < values.length; i++) {
+    acc += values[i];
+    out[i] = acc;
+  }
+  return out;
+}
+
+// "data_bacteria.json.gz" → "data_bacteria.index.json.gz"
+export function indexUrlFor(dataUrl) {
+  return dataUrl.replace(/\.json\.gz$/, '.index.json.gz');
+}
+
+// Fetch and decode an index. Resolves to null if it is missing; callers start
+// this alongside the data download and check indexMatches() once both are in.
+export async function loadOrganismIndex(url) {
+  try {
+    const response = await fetch(url);
+    if (!response.ok) return null;
+    const compressed = new Uint8Array(await response.arrayBuffer());
+    const raw = JSON.parse(new TextDecoder().decode(fflate.decompressSync(compressed)));
+    if (raw.version !== 1) return null;
+
+    // Decode lazily: only postings/row lists actually hit by queries are expanded
+    return {
+      nRows: raw.n_rows,
+      names: raw.names,
+      rows: raw.rows,
+      trigrams: new Map(Object.entries(raw.trigrams)),
+      decodedRows: new Map(),
+      decodedTrigrams: new Map(),
+    };
+  } catch (err) {
+    console.warn(`Organism index ${url} unavailable:`, err);
+    return null;
+  }
+}
+
+// An index built from a different data file would return the wrong rows
+export function indexMatches(index, rows) {
+  return Boolean(index) && index.nRows === rows.length;
+}
+
+function postingsFor(index, gram) {
+  let ids = index.decodedTrigrams.get(gram);
+  if (!ids) {
+    const encoded = index.trigrams.get(gram);
+    if (!encoded) return null;
+    ids = deltaDecode(encoded);
+    index.decodedTrigrams.set(gram, ids);
+  }
+  return ids;
+}
+
+function rowsFor(index, nameId) {
+  let ids = index.decodedRows.get(nameId);
+  if (!ids) {
+    ids = deltaDecode(index.rows[nameId]);
+    index.decodedRows.set(nameId, ids);
+  }
+  return ids;
+}
+
+// Return the Set of row ids whose organism contains `query` (case-insensitive),
+// matching Tabulator's "like" filter semantics.
+export function queryOrganismIndex(index, query) {
+  const q = normalizeQuery(query);
+  const matched = new Set();
+  if (!q) return matched;
+
+  let candidates;
+  if (q.length < NGRAM) {
+    candidates = index.names.keys();
+  } else {
+    const grams = new Set();
+    for (let i = 0; i + NGRAM <= q.length; i++) grams.add(q.slice(i, i + NGRAM));
+
+    const lists = [];
+    for (const gram of grams) {
+      const ids = postingsFor(index, gram);
+      if (!ids) return matched;
+      lists.push(ids);
+    }
+    // Intersect starting from the shortest postings list
+    lists.sort((a, b) => a.length - b.length);
+    let current = new Set(lists[0]);
+    for (let i = 1; i < lists.length && current.size; i++) {
+      const next = new Set();
+      for (const id of lists[i]) if (current.has(id)) next.add(id);
+      current = next;
+    }
+    candidates = current;
+  }
+
+  for (const nameId of candidates) {
+    if (index.names[nameId].includes(q)) {
+      for (const row of rowsFor(index, nameId)) matched.add(row);
+    }
+  }
+  return matched;
+}
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Manage the weekly snapshot store of dashboard datasets (see lrseq.snapshots).
+
+The repository keeps ``genome-dashboard/snapshots/<dataset>/`` — a sorted base
+plus small weekly deltas — instead of committing the full data files every
+week.  The deploy workflow materializes the served ``.json.gz`` files from it.
+
+    snapshot_store.py commit      --store DIR --data-dir DIR [--date YYYY-MM-DD]
+    snapshot_store.py materialize --store DIR --output-dir DIR [--date YYYY-MM-DD]
+    snapshot_store.py diff        --store DIR --dataset NAME OLD NEW
+    snapshot_store.py prune       --store DIR --keep N
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import date as date_cls
+
+# Pipeline stages live in the lrseq package one level up (genome-dashboard/lrseq)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.files import load_json_gz, save_json_gz  # noqa: E402
+from lrseq.snapshots import DATASET_KEYS, open_store  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def commit(args):
+    for name in args.datasets:
+        path = os.path.join(args.data_dir, f"{name}.json.gz")
+        if not os.path.exists(path):
+            logger.warning(f"{path} not found — skipping.")
+            continue
+        records = load_json_gz(path)
+        if not records:
+            logger.warning(f"{path} has no records — skipping.")
+            continue
+        open_store(args.store, name, args.compact_every).commit(args.date, records)
+
+
+def materialize(args):
+    for name in args.datasets:
+        store = open_store(args.store, name)
+        if not store.dates():
+            logger.warning(f"No snapshots for {name} — skipping.")
+            continue
+        snapshot_date = args.date or store.latest()
+        records = store.load(snapshot_date)
+        save_json_gz(records, os.path.join(args.output_dir, f"{name}.json.gz"))
+
+        # Week-over-week changes, read straight from the stored delta
+        dates = store.dates()
+        position = dates.index(snapshot_date)
+        changes = {"date": snapshot_date, "previous": dates[position - 1] if position else None}
+        if position:
+            changes.update(store.diff(dates[position - 1], snapshot_date))
+        with open(os.path.join(args.output_dir, f"{name}.changes.json"), "w", encoding="utf-8") as f:
+            json.dump(changes, f)
+        logger.info(f"{name}: {len(records):,} records as of {snapshot_date}")
+
+
+def diff(args):
+    changes = open_store(args.store, args.dataset).diff(args.old, args.new)
+    print(json.dumps({k: len(v) for k, v in changes.items()}))
+
+
+def prune(args):
+    for name in args.datasets:
+        open_store(args.store, name).prune(args.keep)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the weekly dataset snapshot store.")
+    parser.add_argument("--store", default="genome-dashboard/snapshots", help="Snapshot store directory.")
+    parser.add_argument("--datasets", nargs="+", default=list(DATASET_KEYS), choices=list(DATASET_KEYS),
+                        help="Datasets to operate on. Default: all.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("commit", help="Record the current data files as a snapshot.")
+    p.add_argument("--data-dir", default="genome-dashboard", help="Directory with the <dataset>.json.gz files.")
+    p.add_argument("--date", default=date_cls.today().isoformat(), help="Snapshot date. Default: today.")
+    p.add_argument("--compact-every", type=int, default=8,
+                   help="Start a new base after this many deltas. Default: 8.")
+    p.set_defaults(func=commit)
+
+    p = sub.add_parser("materialize", help="Rebuild the data files for a snapshot date.")
+    p.add_argument("--output-dir", default="genome-dashboard", help="Where to write <dataset>.json.gz.")
+    p.add_argument("--date", default=None, help="Snapshot date. Default: latest.")
+    p.set_defaults(func=materialize)
+
+    p = sub.add_parser("diff", help="Print added/changed/removed counts between two snapshots.")
+    p.add_argument("--dataset", required=True, choices=list(DATASET_KEYS))
+    p.add_argument("old")
+    p.add_argument("new")
+    p.set_defaults(func=diff)
+
+    p = sub.add_parser("prune", help="Delete all but the newest N segments.")
+    p.add_argument("--keep", type=int, required=True)
+    p.set_defaults(func=prune)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,18 @@
 import json
+import os
 import pandas as pd
 from pysradb.sraweb import SRAweb
 import time
 import sys
 import argparse
 
-def summarize_hybrid():
-    parser = argparse.ArgumentParser(description="Summarize hybrid BioSamples.")
-    parser.add_argument("input_file", nargs="?", default="hybrid_biosamples.json", help="Input JSON file path.")
-    parser.add_argument("--output", default="hybrid_data_summary.tsv", help="Output TSV file path.")
-    args = parser.parse_args()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-    input_file = args.input_file
-    output_file = args.output
+from lrseq.profiling import add_profile_argument, profile_run, report_prefix, stage  # noqa: E402
 
+def summarize(input_file, output_file):
     try:
-        with open(input_file, 'r') as f:
+        with stage("load"), open(input_file, 'r') as f:
             data = json.load(f)
     except FileNotFoundError:
         print(f"Error: {input_file} not found.")
@@ -39,7 +36,8 @@ def summarize_hybrid():
         df = None
         for attempt in range(max_retries):
             try:
-                df = db.sra_metadata(batch, detailed=True)
+                with stage("sra_metadata"):
+                    df = db.sra_metadata(batch, detailed=True)
                 success = True
                 break
             except Exception as e:
@@ -50,39 +48,40 @@ def summarize_hybrid():
             print(f"  Failed to process batch after {max_retries} attempts. Skipping.")
             continue
 
-        if df is not None and not df.empty:
-            # Group by biosample to aggregate instruments and pick representative metadata
-            for biosample, group in df.groupby('biosample'):
-                # Sample Type
-                sample_type = "N/A"
-                if 'organism_name' in group.columns:
-                    sample_type = group['organism_name'].dropna().iloc[0] if not group['organism_name'].dropna().empty else "N/A"
-
-                # Environment
-                env = "N/A"
-                # Priority list for environment
-                env_cols = ['env_local_scale', 'env_broad_scale', 'isolation_source', 'env_medium', 'sample_name', 'study_title']
-                for col in env_cols:
-                    if col in group.columns:
-                        vals = group[col].dropna().astype(str).tolist()
-                        # Filter out empty strings, "nan", "not applicable", "missing"
-                        valid_vals = [v for v in vals if v.lower() not in ['nan', '', 'not applicable', 'missing', 'none']]
-                        if valid_vals:
-                            env = valid_vals[0]
-                            break
-
-                # Instruments
-                instruments = "N/A"
-                if 'instrument_model' in group.columns:
-                    inst_list = sorted(list(set(group['instrument_model'].dropna().astype(str).tolist())))
-                    instruments = ", ".join(inst_list)
-
-                results.append({
-                    "BioSample ID": biosample,
-                    "Sample Type": sample_type,
-                    "Environment": env,
-                    "Instruments": instruments
-                })
+        with stage("summarize"):
+            if df is not None and not df.empty:
+                # Group by biosample to aggregate instruments and pick representative metadata
+                for biosample, group in df.groupby('biosample'):
+                    # Sample Type
+                    sample_type = "N/A"
+                    if 'organism_name' in group.columns:
+                        sample_type = group['organism_name'].dropna().iloc[0] if not group['organism_name'].dropna().empty else "N/A"
+
+                    # Environment
+                    env = "N/A"
+                    # Priority list for environment
+                    env_cols = ['env_local_scale', 'env_broad_scale', 'isolation_source', 'env_medium', 'sample_name', 'study_title']
+                    for col in env_cols:
+                        if col in group.columns:
+                            vals = group[col].dropna().astype(str).tolist()
+                            # Filter out empty strings, "nan", "not applicable", "missing"
+                            valid_vals = [v for v in vals if v.lower() not in ['nan', '', 'not applicable', 'missing', 'none']]
+                            if valid_vals:
+                                env = valid_vals[0]
+                                break
+
+                    # Instruments
+                    instruments = "N/A"
+                    if 'instrument_model' in group.columns:
+                        inst_list = sorted(list(set(group['instrument_model'].dropna().astype(str).tolist())))
+                        instruments = ", ".join(inst_list)
+
+                    results.append({
+                        "BioSample ID": biosample,
+                        "Sample Type": sample_type,
+                        "Environment": env,
+                        "Instruments": instruments
+                    })
 
         time.sleep(1) # Rate limit courtesy
 
@@ -105,8 +104,19 @@ def summarize_hybrid():
     # Remove duplicates just in case
     summary_df = summary_df.drop_duplicates(subset=["BioSample ID"])
 
-    summary_df.to_csv(output_file, sep='\t', index=False)
+    with stage("save"):
+        summary_df.to_csv(output_file, sep='\t', index=False)
     print(f"Summary saved to {output_file}")
 
+def summarize_hybrid():
+    parser = argparse.ArgumentParser(description="Summarize hybrid BioSamples.")
+    parser.add_argument("input_file", nargs="?", default="hybrid_biosamples.json", help="Input JSON file path.")
+    parser.add_argument("--output", default="hybrid_data_summary.tsv", help="Output TSV file path.")
+    add_profile_argument(parser, "<output>")
+    args = parser.parse_args()
+
+    with profile_run(report_prefix(args.output), enabled=args.profile):
+        summarize(args.input_file, args.output)
+
 if __name__ == "__main__":
     summarize_hybrid()
@@ -0,0 +1,36 @@
+import unittest
+from build_search_index import build_index, delta_decode, delta_encode, index_path_for, search_index
+
+RECORDS = [
+    {"scientific_name": "Escherichia coli"},
+    {"scientific_name": "Klebsiella pneumoniae"},
+    {"scientific_name": "escherichia  COLI"},
+    {"scientific_name": ""},
+    {"scientific_name": "Escherichia fergusonii"},
+]
+
+class TestBuildSearchIndex(unittest.TestCase):
+    def test_delta_roundtrip(self):
+        values = [0, 3, 4, 10, 250]
+        self.assertEqual(delta_encode(values), [0, 3, 1, 6, 240])
+        self.assertEqual(delta_decode(delta_encode(values)), values)
+
+    def test_names_are_normalized(self):
+        index = build_index(RECORDS)
+        self.assertEqual(index["n_rows"], 5)
+        self.assertEqual(index["names"], ["escherichia coli", "escherichia fergusonii", "klebsiella pneumoniae"])
+        self.assertEqual(delta_decode(index["rows"][0]), [0, 2])
+
+    def test_search_matches_substring_scan(self):
+        index = build_index(RECORDS)
+        self.assertEqual(search_index(index, "Coli"), [0, 2])
+        self.assertEqual(search_index(index, "escherichia"), [0, 2, 4])
+        self.assertEqual(search_index(index, "ae"), [1])
+        self.assertEqual(search_index(index, "xyz"), [])
+        self.assertEqual(search_index(index, ""), [0, 1, 2, 3, 4])
+
+    def test_index_path_for(self):
+        self.assertEqual(index_path_for("data_bacteria.json.gz"), "data_bacteria.index.json.gz")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import date
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq import catalogue  # noqa: E402
+from lrseq.parse import ColumnBatch  # noqa: E402
+
+def runs(*rows):
+    """rows of (run, sample) → one ILLUMINA ColumnBatch"""
+    return ColumnBatch({
+        "accession": [r for r, _ in rows],
+        "sample_accession": [s for _, s in rows],
+        "instrument_platform": ["ILLUMINA"] * len(rows),
+        "instrument_model": ["NovaSeq 6000"] * len(rows),
+        "study_accession": ["PRJ1"] * len(rows),
+    }, len(rows))
+
+class FakeENA:
+    """Serves ``responses[tax_id]`` for ILLUMINA queries and records the queries made."""
+    def __init__(self, responses):
+        self.responses = responses
+        self.queries = []
+
+    def __call__(self, query, fields, label, strict=False):
+        self.queries.append(query)
+        if not query.startswith('instrument_platform="ILLUMINA"'):
+            return []
+        tax_id = query.split("tax_tree(")[1].split(")")[0]
+        return [self.responses[tax_id]]
+
+class TestShortReadCatalogue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "catalogue")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def refresh(self, responses, today, tax_ids=("2", "408169")):
+        fake = FakeENA(responses)
+        with mock.patch.object(catalogue, "fetch_ena_batches", fake):
+            result = catalogue.refresh_catalogue(self.path, tax_ids, full_refresh_days=28, today=today)
+        return result, fake.queries
+
+    def test_lookup_and_delta_refresh(self):
+        self.refresh({"2": runs(("R1", "SAMA"), ("R2", "SAMA"), ("R3", "SAMB"), ("R4", "NA")),
+                      "408169": runs(("R5", "SAMC"))}, date(2026, 1, 4))
+        cat, queries = self.refresh({"2": runs(("R6", "SAMD"), ("R3", "SAME")),
+                                     "408169": runs()}, date(2026, 1, 11))
+        self.assertTrue(all("last_updated>=2026-01-04" in q for q in queries))
+
+        found = cat.lookup(["SAMA", "SAMB", "SAMC", "SAMD", "SAME", "SAMZ", "SAMPLE_ID_LONGER_THAN_ANY_KEY"])
+        self.assertEqual({s: [r["accession"] for r in rs] for s, rs in found.items()},
+                         {"SAMA": ["R1", "R2"], "SAMC": ["R5"], "SAMD": ["R6"], "SAME": ["R3"]})
+        self.assertEqual(found["SAMC"][0]["instrument_platform"], "ILLUMINA")
+        self.assertEqual(cat.meta["watermarks"], {"2": "2026-01-11", "408169": "2026-01-11"})
+
+    def test_full_refresh_drops_suppressed_runs(self):
+        self.refresh({"2": runs(("R1", "SAMA"), ("R2", "SAMB")), "408169": runs(("R5", "SAMC"))},
+                     date(2026, 1, 4))
+        cat, queries = self.refresh({"2": runs(("R2", "SAMB"))}, date(2026, 2, 1), tax_ids=["2"])
+        self.assertFalse(any("last_updated" in q for q in queries))
+        self.assertEqual(sorted(cat.lookup(["SAMA", "SAMB", "SAMC"])), ["SAMB", "SAMC"])
+
+    def test_failed_refresh_keeps_rows_and_watermark(self):
+        self.refresh({"2": runs(("R1", "SAMA"))}, date(2026, 1, 4), tax_ids=["2"])
+        with mock.patch.object(catalogue, "_fetch_columns", side_effect=RuntimeError("ENA down")):
+            cat = catalogue.refresh_catalogue(self.path, ["2"], today=date(2026, 1, 11))
+        self.assertEqual(list(cat.lookup(["SAMA"])), ["SAMA"])
+        self.assertEqual(cat.meta["watermarks"], {"2": "2026-01-04"})
+        self.assertTrue(cat.covers("2"))
+
+    def test_failed_cold_refresh_is_not_covered(self):
+        with mock.patch.object(catalogue, "_fetch_columns", side_effect=RuntimeError("ENA down")):
+            cat = catalogue.refresh_catalogue(self.path, ["2"], today=date(2026, 1, 11))
+        self.assertFalse(cat.covers("2"))
+        self.assertEqual(cat.lookup(["SAMA"]), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq import ena  # noqa: E402
+
+class FakeResponse:
+    ok = True
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+def serve(tables):
+    """requests.get stand-in answering each instrument_platform query from ``tables``."""
+    def get(url, params, timeout, stream):
+        platform = params["query"].split('"')[1]
+        return FakeResponse(tables.get(platform, b""))
+    return get
+
+RUNS = (b"run_accession\tsample_accession\tinstrument_platform\tinstrument_model\tstudy_accession\n"
+        b"SRR1\tSAMN1\tILLUMINA\tNovaSeq\tPRJ1\n"
+        b"SRR2\tSAMN2\tILLUMINA\tNovaSeq\tPRJ1\n"
+        b"SRR3\tSAMN1 \tILLUMINA\tMiSeq\tPRJ2\n"
+        b"SRR4\tN/A\tILLUMINA\tMiSeq\tPRJ2\n")
+
+class TestEna(unittest.TestCase):
+    def test_fetch_run_index_keeps_requested_samples(self):
+        with mock.patch.object(ena.requests, "get", serve({"ILLUMINA": RUNS})):
+            index = ena.fetch_run_index(["ILLUMINA", "BGISEQ"], "2", samples={"SAMN1"})
+        self.assertEqual(list(index), ["SAMN1"])
+        self.assertEqual([r["accession"] for r in index["SAMN1"]], ["SRR1", "SRR3"])
+        with mock.patch.object(ena.requests, "get", serve({"ILLUMINA": RUNS})):
+            self.assertEqual(sorted(ena.fetch_run_index(["ILLUMINA"], "2")), ["SAMN1", "SAMN2"])
+
+    def test_fetch_ena_genome_records(self):
+        body = ("\t".join(ena.GENOME_FIELDS.split(",")) + "\n"
+                "ERR1\tSAMEA1\tE. coli\tPACBIO_SMRT\tSequel\tPRJ1\t10\t1000\tWGS\t2024-01-02\n").encode()
+        with mock.patch.object(ena.requests, "get", serve({"PACBIO_SMRT": body})):
+            records = ena.fetch_ena("PACBIO_SMRT", "2")
+        self.assertEqual(records, [{
+            "sample_id": "ERR1", "sample_accession": "SAMEA1", "scientific_name": "E. coli",
+            "instrument_platform": "PACBIO_SMRT", "instrument_model": "Sequel", "study_accession": "PRJ1",
+            "read_count": 10, "base_count": 1000, "library_strategy": "WGS", "first_public": "2024-01-02",
+            "source": "ENA",
+        }])
+
+    def test_strict_long_read_fetch_raises(self):
+        def get(url, params, timeout, stream):
+            if "OXFORD_NANOPORE" in params["query"]:
+                raise ConnectionError("ENA down")
+            return FakeResponse(b"")
+        with mock.patch.object(ena.requests, "get", get), mock.patch.object(ena.time, "sleep"):
+            self.assertEqual(ena.fetch_long_read_records("2"), [])
+            with self.assertRaises(RuntimeError):
+                ena.fetch_long_read_records("2", strict=True)
+
+if __name__ == '__main__':
+    unittest.main()
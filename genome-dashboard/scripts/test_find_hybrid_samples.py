@@ -1,18 +1,75 @@
+import os
+import sys
 import unittest
-from find_hybrid_samples import classify_platform
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.hybrid import (  # noqa: E402
+    find_hybrid_samples, index_batches, index_by_sample, is_valid_sample, runs_from_records,
+)
+from lrseq.parse import ColumnBatch  # noqa: E402
+
+def run(accession, sample, platform, study="PRJ1", pubmed=""):
+    return {"accession": accession, "sample_accession": sample, "scientific_name": "Escherichia coli",
+            "instrument_platform": platform, "instrument_model": "MinION" if platform == "OXFORD_NANOPORE" else "NextSeq 500",
+            "study_accession": study, "pubmed_id": pubmed}
 
 class TestFindHybridSamples(unittest.TestCase):
-    def test_classify_platform(self):
-        self.assertEqual(classify_platform('Illumina MiSeq'), 'SHORT')
-        self.assertEqual(classify_platform('MinION'), 'LONG')
-        self.assertEqual(classify_platform('GridION'), 'LONG')
-        self.assertEqual(classify_platform('PacBio RS II'), 'LONG')
-        self.assertEqual(classify_platform('NextSeq 500'), 'SHORT')
-        self.assertEqual(classify_platform('DNBSEQ-T7'), 'SHORT')
-        self.assertEqual(classify_platform('Ion Torrent PGM'), 'SHORT')
-        self.assertEqual(classify_platform('Unknown'), 'OTHER')
-        self.assertEqual(classify_platform(None), 'OTHER')
-        self.assertEqual(classify_platform(123), 'OTHER')
+    def test_is_valid_sample(self):
+        self.assertTrue(is_valid_sample("SAMEA1"))
+        self.assertTrue(is_valid_sample(" SAMEA1 "))
+        for placeholder in ("", "  ", None, "N/A", "none"):
+            self.assertFalse(is_valid_sample(placeholder))
+
+    def test_index_by_sample_drops_placeholders(self):
+        by_sample = index_by_sample([run("ERR1", "SAMA", "OXFORD_NANOPORE"), run("ERR2", " SAMA", "PACBIO_SMRT"),
+                                     run("ERR3", "N/A", "OXFORD_NANOPORE"), run("ERR4", "", "OXFORD_NANOPORE")])
+        self.assertEqual(list(by_sample), ["SAMA"])
+        self.assertEqual([r["accession"] for r in by_sample["SAMA"]], ["ERR1", "ERR2"])
+
+    def test_index_batches_matches_index_by_sample(self):
+        columns = {"accession": ["ERR1", "ERR2", "ERR3"], "sample_accession": ["SAMA", "SAMB", "none"],
+                   "read_count": array("q", [1, 2, 3])}
+        batch = ColumnBatch(columns, 3).pack()
+        by_sample = index_batches([batch])
+        self.assertEqual(by_sample, {"SAMA": [{"accession": "ERR1", "sample_accession": "SAMA", "read_count": 1}],
+                                     "SAMB": [{"accession": "ERR2", "sample_accession": "SAMB", "read_count": 2}]})
+        # With samples only those biosamples are kept, added to an existing index
+        index_batches([batch], samples={"SAMB"}, by_sample=by_sample)
+        self.assertEqual([r["accession"] for r in by_sample["SAMB"]], ["ERR2", "ERR2"])
+        self.assertEqual(len(by_sample["SAMA"]), 1)
+
+    def test_runs_from_records(self):
+        records = [{"sample_id": "ERR1", "sample_accession": "SAMA", "scientific_name": "Escherichia coli",
+                    "instrument_platform": "OXFORD_NANOPORE", "instrument_model": "MinION",
+                    "study_accession": "PRJ1", "read_count": 10},
+                   {"sample_id": "ERR2", "sample_accession": "", "instrument_platform": "PACBIO_SMRT"}]
+        runs = runs_from_records(records)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(runs[0]["accession"], "ERR1")
+        self.assertEqual(runs[0]["sample_accession"], "SAMA")
+        self.assertNotIn("read_count", runs[0])
+
+    def test_find_hybrid_samples(self):
+        long_runs = [run("ERR2", "SAMB", "OXFORD_NANOPORE", "PRJ2"), run("ERR1", "SAMB", "PACBIO_SMRT", "PRJ1", "123"),
+                     run("ERR3", "SAMA", "OXFORD_NANOPORE"), run("ERR9", "SAMC", "OXFORD_NANOPORE")]
+        short_runs = [run("SRR2", "SAMB", "ILLUMINA", "PRJ3", "456, 123"), run("SRR1", "SAMA", "ILLUMINA"),
+                      run("SRR5", "SAMD", "ILLUMINA")]
+        hybrids = find_hybrid_samples(index_by_sample(long_runs), index_by_sample(short_runs))
+        self.assertEqual([h["biosample"] for h in hybrids], ["SAMA", "SAMB"])
+        samb = hybrids[1]
+        self.assertEqual(samb["pubmed_ids"], ["123", "456"])
+        self.assertEqual(samb["study_accession"], ["PRJ1", "PRJ2", "PRJ3"])
+        self.assertEqual([r["run_accession"] for r in samb["long_reads"]], ["ERR1", "ERR2"])
+        self.assertEqual(samb["short_reads"], [{"run_accession": "SRR2", "instrument_model": "NextSeq 500",
+                                                "instrument_platform": "ILLUMINA", "study_accession": "PRJ3"}])
+        # Input order does not change the records
+        again = find_hybrid_samples(index_by_sample(reversed(long_runs)), index_by_sample(reversed(short_runs)))
+        self.assertEqual(again, hybrids)
+
+    def test_no_overlap(self):
+        self.assertEqual(find_hybrid_samples(index_by_sample([run("ERR1", "SAMA", "OXFORD_NANOPORE")]), {}), [])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.growth import build_growth_table, cumulative_counts, resample_growth  # noqa: E402
+
+def run(day, platform="ILLUMINA"):
+    return {"first_public": day, "instrument_platform": platform}
+
+class TestCumulativeCounts(unittest.TestCase):
+    def test_bins_per_platform_and_day(self):
+        df = cumulative_counts([
+            run("2024-01-03", "PACBIO_SMRT"), run("2024-01-01", "OXFORD_NANOPORE"),
+            run("2024-01-03", "OXFORD_NANOPORE"), run("2024-01-03", "OXFORD_NANOPORE"),
+            run("", "OXFORD_NANOPORE"), run("not a date"), {"first_public": "2024-01-02"},
+        ])
+        self.assertEqual(list(df.columns), ["OXFORD_NANOPORE", "PACBIO_SMRT", "Unknown"])
+        self.assertEqual(list(df.index), list(pd.date_range("2024-01-01", "2024-01-03")))
+        self.assertEqual(df["OXFORD_NANOPORE"].tolist(), [1, 1, 3])
+        self.assertEqual(df["PACBIO_SMRT"].tolist(), [0, 0, 1])
+        self.assertEqual(df["Unknown"].tolist(), [0, 1, 1])
+
+    def test_no_dates(self):
+        self.assertTrue(cumulative_counts([run(""), {}]).empty)
+
+class TestGrowthTable(unittest.TestCase):
+    def setUp(self):
+        self.table = build_growth_table({
+            "wgs": [run("2024-01-01"), run("2024-01-04", "PACBIO_SMRT")],
+            "mgx": [run("2024-01-02"), run("2024-01-02")],
+            "empty": [run("")],
+        })
+
+    def test_forward_fills_union_of_dates(self):
+        self.assertEqual(self.table.index.name, "date")
+        self.assertEqual(list(self.table.index), list(pd.date_range("2024-01-01", "2024-01-04")))
+        self.assertEqual(self.table["wgs_ILLUMINA"].tolist(), [1, 1, 1, 1])
+        self.assertEqual(self.table["wgs_PACBIO_SMRT"].tolist(), [0, 0, 0, 1])
+        self.assertEqual(self.table["wgs_total"].tolist(), [1, 1, 1, 2])
+        # mgx starts a day later: zeros before, carried forward after
+        self.assertEqual(self.table["mgx_total"].tolist(), [0, 2, 2, 2])
+        self.assertNotIn("empty_total", self.table.columns)
+
+    def test_resample_keeps_period_end(self):
+        two_day = resample_growth(self.table, "2D")
+        self.assertEqual(two_day["wgs_total"].tolist(), [1, 2])
+        weekly = resample_growth(self.table, "W")
+        self.assertEqual(list(weekly.index), [pd.Timestamp("2024-01-07")])
+        self.assertEqual(weekly["mgx_total"].tolist(), [2])
+        self.assertIs(resample_growth(self.table, "D"), self.table)
+
+    def test_empty(self):
+        self.assertTrue(build_growth_table({"wgs": []}).empty)
+        self.assertTrue(resample_growth(pd.DataFrame(), "W").empty)
+
+if __name__ == '__main__':
+    unittest.main()
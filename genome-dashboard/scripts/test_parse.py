@@ -0,0 +1,80 @@
+import argparse
+import io
+import os
+import sys
+import unittest
+from array import array
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.parse import _env_int, _Spool, add_parse_arguments, chunk_ranges, parse_lines, parse_spool  # noqa: E402
+
+HEADER = ["run_accession", "sample_accession", "read_count"]
+
+class TestParse(unittest.TestCase):
+    def test_parse_lines_typed_columns(self):
+        batch = parse_lines(b"ERR1\tSAMEA1\t10\nERR2\tSAMEA2\t\n", HEADER)
+        self.assertEqual(batch.n_rows, 2)
+        self.assertEqual(batch.columns["read_count"], array("q", [10, 0]))
+        self.assertEqual(batch.records()[0], {"run_accession": "ERR1", "sample_accession": "SAMEA1", "read_count": 10})
+
+    def test_parse_lines_ragged_rows(self):
+        batch = parse_lines(b"ERR1\tSAMEA1\t10\n\nERR2\n", HEADER)
+        self.assertEqual(batch.n_rows, 2)
+        self.assertEqual(batch.columns["sample_accession"], ["SAMEA1", ""])
+
+    def test_parse_lines_opposite_ragged_rows(self):
+        # 4 + 2 fields add up to two full rows but must not shift into other columns
+        batch = parse_lines(b"A\tB\tC\tX\nD\tE\n", ["a", "b", "c"])
+        self.assertEqual(batch.records(), [{"a": "A", "b": "B", "c": "C"}, {"a": "D", "b": "E", "c": ""}])
+
+    def test_pack_roundtrip(self):
+        batch = parse_lines(b"ERR1\tSAMEA1\t10\nERR2\tSAMEA2\t5\n", HEADER)
+        self.assertEqual(batch.pack().unpack().records(), batch.records())
+
+    def test_chunk_ranges_are_line_aligned(self):
+        data = b"".join(f"ERR{i}\tSAMEA{i}\t{i}\n".encode() for i in range(100))
+        ranges = chunk_ranges(io.BytesIO(data), 0, len(data), 50)
+        self.assertEqual(ranges[0][0], 0)
+        self.assertEqual(ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[end - 1:end], b"\n")
+
+    def test_parse_spool_renames_run_accession(self):
+        spool = _Spool(1 << 20)
+        spool.write(b"run_accession\tsample_accession\tread_count\nERR1\tSAMEA1\t3\n")
+        batches = list(parse_spool(spool, workers=1))
+        self.assertEqual(batches[0].records(), [{"accession": "ERR1", "sample_accession": "SAMEA1", "read_count": 3}])
+
+    def test_parse_spool_in_memory_uses_workers(self):
+        rows = b"".join(f"ERR{i}\tSAMEA{i}\t{i}\n".encode() for i in range(150000))
+        spool = _Spool(64 << 20)
+        spool.write(b"run_accession\tsample_accession\tread_count\n" + rows)
+        self.assertIsNone(spool.path)
+        # 2 workers and a small budget give several 1 MiB chunks
+        batches = list(parse_spool(spool, workers=2, memory_budget=1 << 20))
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sum(b.n_rows for b in batches), 150000)
+        self.assertEqual(batches[-1].records()[-1], {"accession": "ERR149999", "sample_accession": "SAMEA149999",
+                                                     "read_count": 149999})
+
+class TestSettings(unittest.TestCase):
+    def test_env_int_ignores_empty_and_invalid(self):
+        for value, expected in [("", None), ("  ", None), ("abc", None), ("0", None), ("-2", None), (" 4 ", 4)]:
+            with mock.patch.dict(os.environ, {"LRSEQ_PARSE_WORKERS": value}):
+                self.assertEqual(_env_int("LRSEQ_PARSE_WORKERS"), expected, value)
+        with mock.patch.dict(os.environ, {}, clear=True):
+            self.assertIsNone(_env_int("LRSEQ_PARSE_WORKERS"))
+
+    def test_add_parse_arguments(self):
+        parser = argparse.ArgumentParser()
+        add_parse_arguments(parser)
+        args = parser.parse_args(["--parse-workers", "2", "--memory-budget-mb", "64"])
+        self.assertEqual((args.parse_workers, args.memory_budget_mb), (2, 64))
+        args = parser.parse_args([])
+        self.assertEqual((args.parse_workers, args.memory_budget_mb), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
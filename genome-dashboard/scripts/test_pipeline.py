@@ -0,0 +1,152 @@
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq import pipeline  # noqa: E402
+from lrseq.files import load_json_gz  # noqa: E402
+from lrseq.snapshots import DATASET_KEYS, SnapshotStore  # noqa: E402
+
+def long_read_records(tax_id, strict=False):
+    return [
+        {"sample_id": f"ERR{tax_id}1", "sample_accession": "SAMA", "scientific_name": "Escherichia coli",
+         "instrument_platform": "OXFORD_NANOPORE", "instrument_model": "MinION", "study_accession": "PRJ1"},
+        {"sample_id": f"ERR{tax_id}2", "sample_accession": "SAMB", "scientific_name": "Bacillus subtilis",
+         "instrument_platform": "PACBIO_SMRT", "instrument_model": "Sequel II", "study_accession": "PRJ2"},
+    ]
+
+def short_read_index(platforms, tax_id, fields=None, samples=None, strict=False):
+    runs = {"SAMA": [{"accession": "SRR1", "sample_accession": "SAMA", "instrument_platform": "ILLUMINA",
+                      "instrument_model": "NextSeq 500", "study_accession": "PRJ3"}],
+            "SAMZ": [{"accession": "SRR9", "sample_accession": "SAMZ", "instrument_platform": "ILLUMINA"}]}
+    return {sa: r for sa, r in runs.items() if samples is None or sa in samples}
+
+class FakeCatalogue:
+    def __init__(self, covered):
+        self.covered = covered
+
+    def covers(self, tax_id):
+        return tax_id in self.covered
+
+    def lookup(self, samples):
+        return short_read_index(None, None, samples=samples)
+
+class TestBuildDataset(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(pipeline, "fetch_long_read_records", side_effect=long_read_records),
+            mock.patch.object(pipeline, "fetch_run_index", side_effect=short_read_index),
+            # Stages hand records over in memory; nothing is read back from disk
+            mock.patch.object(gzip, "open", side_effect=AssertionError("file read")),
+        ]
+        self.fetch_long, self.fetch_short, _ = [p.start() for p in patches]
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def test_fetch_to_hybrids_in_memory(self):
+        result = pipeline.build_dataset("wgs")
+        self.assertEqual([r["sample_id"] for r in result.records], ["ERR21", "ERR22"])
+        self.assertEqual([h["biosample"] for h in result.hybrids], ["SAMA"])
+        self.assertEqual(result.hybrids[0]["long_reads"][0]["run_accession"], "ERR21")
+        self.assertEqual(result.hybrids[0]["short_reads"][0]["run_accession"], "SRR1")
+        # Only short reads of the long-read biosamples are indexed
+        self.assertEqual(set(self.fetch_short.call_args.kwargs["samples"]), {"SAMA", "SAMB"})
+
+    def test_catalogue_lookup(self):
+        result = pipeline.build_dataset("mgx", catalogue=FakeCatalogue({"408169"}))
+        self.assertEqual([h["biosample"] for h in result.hybrids], ["SAMA"])
+        self.fetch_short.assert_not_called()
+        # A taxon the catalogue could not refresh is fetched directly
+        pipeline.build_dataset("wgs", catalogue=FakeCatalogue({"408169"}))
+        self.fetch_short.assert_called_once()
+
+    def test_sampled_fetches_short_reads_by_biosample(self):
+        with mock.patch.object(pipeline, "fetch_run_index_for_samples",
+                               side_effect=lambda platforms, samples: short_read_index(None, None, samples=samples)):
+            result = pipeline.build_dataset("wgs", sample_size=1, seed=0)
+        self.assertEqual(len(result.records), 1)
+        self.assertLessEqual(len(result.hybrids), 1)
+        self.fetch_short.assert_not_called()
+
+    def test_long_read_failure_skips_dataset(self):
+        self.fetch_long.side_effect = RuntimeError("ENA down")
+        result = pipeline.build_dataset("wgs")
+        self.assertIsNone(result.records)
+        self.assertIsNone(result.hybrids)
+        self.assertEqual(self.fetch_long.call_args.kwargs, {"strict": True})
+        self.fetch_short.assert_not_called()
+
+    def test_short_read_failure_skips_hybrids(self):
+        self.fetch_short.side_effect = RuntimeError("ENA down")
+        result = pipeline.build_dataset("wgs")
+        self.assertEqual(len(result.records), 2)
+        self.assertIsNone(result.hybrids)
+
+class TestRunPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patches = [
+            mock.patch.object(pipeline, "fetch_long_read_records", side_effect=long_read_records),
+            mock.patch.object(pipeline, "fetch_run_index", side_effect=short_read_index),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_writes_dashboard_files_and_snapshots(self):
+        out, snapshots = os.path.join(self.tmp.name, "out"), os.path.join(self.tmp.name, "snapshots")
+        results = pipeline.run_pipeline(out, plots=False, snapshot_dir=snapshots)
+        self.assertEqual(load_json_gz(os.path.join(out, "data_metagenome.json.gz")), results["mgx"].records)
+        self.assertEqual(load_json_gz(os.path.join(out, "hybrid_wgs.json.gz")), results["wgs"].hybrids)
+        self.assertEqual(sorted(os.listdir(snapshots)),
+                         ["data_bacteria", "data_metagenome", "hybrid_mgx", "hybrid_wgs"])
+
+    def test_failed_fetch_keeps_files_and_snapshots(self):
+        out, snapshots = os.path.join(self.tmp.name, "out"), os.path.join(self.tmp.name, "snapshots")
+        first = pipeline.run_pipeline(out, plots=False, snapshot_dir=snapshots)
+
+        def fail_wgs(tax_id, strict=False):
+            if tax_id == "2":
+                raise RuntimeError("ENA down")
+            return long_read_records(tax_id)
+        # A week later
+        with mock.patch.object(pipeline, "fetch_long_read_records", side_effect=fail_wgs), \
+                mock.patch.object(pipeline, "datetime") as clock:
+            clock.now.return_value = datetime.now() + timedelta(days=7)
+            second = pipeline.run_pipeline(out, plots=False, snapshot_dir=snapshots)
+        # The served file and the plots' records are the previous ones; nothing is committed for wgs
+        self.assertEqual(load_json_gz(os.path.join(out, "data_bacteria.json.gz")), first["wgs"].records)
+        self.assertEqual(second["wgs"].records, first["wgs"].records)
+        self.assertEqual(load_json_gz(os.path.join(out, "hybrid_wgs.json.gz")), first["wgs"].hybrids)
+        for name in ("data_bacteria", "hybrid_wgs"):
+            self.assertEqual(len(SnapshotStore(os.path.join(snapshots, name), DATASET_KEYS[name]).dates()), 1)
+        for name in ("data_metagenome", "hybrid_mgx"):
+            self.assertEqual(len(SnapshotStore(os.path.join(snapshots, name), DATASET_KEYS[name]).dates()), 2)
+
+    def test_skipped_hybrids_keep_previous_count(self):
+        out = os.path.join(self.tmp.name, "out")
+        os.makedirs(out)
+        with open(os.path.join(out, "sample_counts.csv"), "w") as f:
+            f.write("date,wgs_samples,mgx_samples,run_id,hybrid_wgs,hybrid_mgx\n"
+                    "2000-01-02,1,1,,7,5\n2000-01-01,1,1,,3,3\n")
+        with mock.patch.object(pipeline, "fetch_run_index", side_effect=RuntimeError("ENA down")), \
+                mock.patch("lrseq.plots.generate_plot"), mock.patch("lrseq.plots.generate_organism_bubble_plot"), \
+                mock.patch("lrseq.plots.generate_growth_plot"):
+            pipeline.run_pipeline(out)
+        with open(os.path.join(out, "sample_counts.csv")) as f:
+            last = f.read().splitlines()[-1].split(",")
+        self.assertEqual(last[1:3], ["2", "2"])
+        self.assertEqual(last[-2:], ["7", "5"])
+
+    def test_sampled_run_refuses_dashboard_dir(self):
+        with self.assertRaises(ValueError):
+            pipeline.run_pipeline(pipeline.DASHBOARD_DIR, plots=False, sample_size=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.profiling import profile_run, render_flamegraph, report_prefix, stage, worker_initializer  # noqa: E402
+
+def build_index(n):
+    by_sample = {}
+    for i in range(n):
+        by_sample.setdefault(f"SAMN{i % 500}", []).append(f"R{i}")
+    return by_sample
+
+class TestProfiling(unittest.TestCase):
+    def test_report_prefix(self):
+        self.assertEqual(report_prefix("out/hybrid_wgs.json.gz"), "out/hybrid_wgs")
+        self.assertEqual(report_prefix("hybrid_data_summary.tsv"), "hybrid_data_summary")
+
+    def test_workers_do_not_trace(self):
+        # Forked workers inherit the parent's tracing unless the initializer stops it
+        tracemalloc.start()
+        try:
+            with ProcessPoolExecutor(max_workers=1, initializer=worker_initializer) as pool:
+                self.assertFalse(pool.submit(tracemalloc.is_tracing).result())
+        finally:
+            tracemalloc.stop()
+
+    def test_stage_is_noop_without_profiler(self):
+        with stage("index"):
+            self.assertEqual(len(build_index(10)), 10)
+
+    def test_profile_run_writes_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            prefix = os.path.join(tmp, "hybrid_wgs")
+            with profile_run(prefix, interval=0.001):
+                with stage("index"):
+                    kept = build_index(200000)
+                    with stage("json.save"):
+                        time.sleep(0.05)
+                with stage("index"):
+                    build_index(1000)
+
+            self.assertEqual(sorted(f for f in os.listdir(tmp)),
+                             [f"hybrid_wgs.profile.{ext}" for ext in ("folded", "json", "svg", "txt")])
+            with open(f"{prefix}.profile.json", encoding="utf-8") as f:
+                stages = json.load(f)["stages"]
+            self.assertEqual(list(stages), ["index", "index;json.save"])
+            self.assertEqual(stages["index"]["calls"], 2)
+            self.assertGreaterEqual(stages["index;json.save"]["wall_s"], 0.05)
+            self.assertGreater(stages["index"]["samples"], 0)
+            self.assertTrue(any("test_profiling.py" in a["site"] for a in stages["index"]["top_allocators"]))
+            self.assertEqual(stages["index;json.save"]["top_allocators"], [])
+
+            with open(f"{prefix}.profile.folded", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            self.assertTrue(any(line.startswith("index;") and "build_index" in line for line in lines))
+            self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertEqual(len(kept), 500)
+
+    def test_render_flamegraph(self):
+        svg = render_flamegraph({"index;a;b": 3, "index;a": 1, "save;<c>": 4}, "run")
+        self.assertTrue(svg.startswith("<svg"))
+        self.assertIn("&lt;c&gt;", svg)
+        self.assertIn("index (4 samples, 50.0%)", svg)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.sampling import allocate, stratified_sample  # noqa: E402
+
+def make_records():
+    records = []
+    for i in range(200):
+        records.append({
+            "sample_id": f"ERR{i:06d}",
+            # Every fourth biosample has three runs
+            "sample_accession": f"SAMEA{i // 12 if i % 4 == 0 else 1000 + i}",
+            "scientific_name": ["Escherichia coli", "Klebsiella pneumoniae", "Bacillus subtilis"][i % 3],
+            "instrument_platform": "OXFORD_NANOPORE" if i % 2 else "PACBIO_SMRT",
+            "instrument_model": "MinION",
+            "library_strategy": "WGS",
+        })
+    return records
+
+class TestStratifiedSample(unittest.TestCase):
+    def test_allocate_is_proportional(self):
+        self.assertEqual(allocate({"a": 60, "b": 30, "c": 10}, 10), {"a": 6, "b": 3, "c": 1})
+        self.assertEqual(sum(allocate({"a": 5, "b": 5, "c": 5}, 10).values()), 10)
+        self.assertEqual(allocate({"a": 2}, 10), {"a": 2})
+
+    def test_reproducible_and_order_independent(self):
+        records = make_records()
+        a = stratified_sample(records, 40, seed=7)
+        b = stratified_sample(list(reversed(records)), 40, seed=7)
+        self.assertEqual(sorted(r["sample_id"] for r in a), sorted(r["sample_id"] for r in b))
+        self.assertLessEqual(len(a), 40)
+        self.assertGreater(len(a), 30)
+
+    def test_keeps_full_schema_and_whole_biosamples(self):
+        records = make_records()
+        sample = stratified_sample(records, 50, seed=1)
+        self.assertEqual(set(sample[0]), set(records[0]))
+        chosen = {r["sample_accession"] for r in sample}
+        expected = [r for r in records if r["sample_accession"] in chosen]
+        self.assertEqual(sample, expected)
+
+if __name__ == '__main__':
+    unittest.main()
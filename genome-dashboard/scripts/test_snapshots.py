@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from lrseq.hybrid import find_hybrid_samples  # noqa: E402
+from lrseq.snapshots import SnapshotStore  # noqa: E402
+
+def week(ids, changed=()):
+    return [{"sample_id": i, "read_count": 2 if i in changed else 1} for i in ids]
+
+class TestSnapshotStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data_bacteria")
+        self.weeks = {
+            "2026-01-04": week(["A", "B", "C"]),
+            "2026-01-11": week(["A", "C", "D"], changed={"C"}),
+            "2026-01-18": week(["A", "D", "E"]),
+            "2026-01-25": week(["E", "F"]),
+        }
+        store = SnapshotStore(self.path, "sample_id", compact_every=2)
+        for date, records in self.weeks.items():
+            store.commit(date, records)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rebuilds_every_week(self):
+        store = SnapshotStore(self.path, "sample_id")
+        self.assertEqual(store.dates(), list(self.weeks))
+        self.assertEqual([s["base"] for s in store.segments], ["2026-01-04", "2026-01-25"])
+        for date, records in self.weeks.items():
+            self.assertEqual(store.load(date), records)
+
+    def test_diff(self):
+        store = SnapshotStore(self.path, "sample_id")
+        self.assertEqual(store.diff("2026-01-04", "2026-01-11"),
+                         {"added": ["D"], "changed": ["C"], "removed": ["B"]})
+        # Across a compaction the new base keeps its own delta
+        self.assertEqual(store.diff("2026-01-18", "2026-01-25"),
+                         {"added": ["F"], "changed": [], "removed": ["A", "D"]})
+        self.assertEqual(store.diff("2026-01-04", "2026-01-25"),
+                         {"added": ["E", "F"], "changed": [], "removed": ["A", "B", "C"]})
+
+    def test_recommit_and_prune(self):
+        store = SnapshotStore(self.path, "sample_id", compact_every=2)
+        store.commit("2026-01-25", week(["F"]))
+        self.assertEqual(store.load(), week(["F"]))
+        with self.assertRaises(ValueError):
+            store.commit("2026-01-01", week(["A"]))
+        store.prune(1)
+        self.assertEqual(store.dates(), ["2026-01-25"])
+        self.assertEqual(sorted(os.listdir(self.path)),
+                         ["2026-01-25.base.json.gz", "2026-01-25.delta.json.gz", "manifest.json"])
+
+    def test_schema_change_starts_base(self):
+        store = SnapshotStore(self.path, "sample_id", compact_every=8)
+        store.commit("2026-02-01", [dict(r, first_public="2020-01-01") for r in week(["E", "F", "G"])])
+        self.assertEqual(store.segments[-1], {"base": "2026-02-01", "deltas": []})
+        # The new field alone is not a change; the delta stays a week-over-week diff
+        self.assertEqual(store.diff("2026-01-25", "2026-02-01"), {"added": ["G"], "changed": [], "removed": []})
+        self.assertEqual(store.load()[0], {"sample_id": "E", "read_count": 1, "first_public": "2020-01-01"})
+
+    def test_refuses_empty_snapshot(self):
+        store = SnapshotStore(self.path, "sample_id", compact_every=2)
+        with self.assertRaises(ValueError):
+            store.commit("2026-01-25", [])
+        with self.assertRaises(ValueError):
+            store.commit("2026-02-01", [])
+        # Nothing was dropped or written
+        store = SnapshotStore(self.path, "sample_id")
+        self.assertEqual(store.dates(), list(self.weeks))
+        self.assertEqual(store.load(), self.weeks["2026-01-25"])
+
+class TestHybridDeltas(unittest.TestCase):
+    def test_unchanged_biosamples_give_empty_delta(self):
+        def runs(order):
+            return {"SAMN1": [{"accession": f"R{i}", "study_accession": f"PRJ{i}", "instrument_model": "M"}
+                              for i in order]}
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SnapshotStore(os.path.join(tmp, "hybrid_wgs"), "biosample")
+            store.commit("2026-01-04", find_hybrid_samples(runs([1, 2, 3]), runs([4, 5, 6])))
+            delta = store.commit("2026-01-11", find_hybrid_samples(runs([3, 1, 2]), runs([6, 4, 5])))
+            self.assertEqual(delta, {"added": [], "changed": [], "removed": []})
+            self.assertEqual(store.load()[0]["study_accession"], [f"PRJ{i}" for i in range(1, 7)])
+
+if __name__ == '__main__':
+    unittest.main()